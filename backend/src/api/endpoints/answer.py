@@ -1,13 +1,43 @@
+from typing import AsyncIterator
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from src.api.schemas.query import Query
+from src.api.schemas.query import BatchQuery, BatchRequest, Query
 from src.api.schemas.response import Answer
-from src.graph.graph import router_workflow
+from src.api.services.batch import answer_query, run_batch
+from src.api.services.events import answer_event_stream
+from src.config.batch import batch_settings
 
 answer_router = APIRouter()
 
 
 @answer_router.post("/answer")
 async def answer(request: Query) -> Answer:
-    state = await router_workflow.ainvoke({"input": request.query})
-    return Answer(answer=state["output"], router=state["decision"])
+    output, router, _ = await answer_query(request.query)
+    return Answer(answer=output, router=router)
+
+
+@answer_router.post("/answer/stream")
+async def answer_stream(request: Query) -> StreamingResponse:
+    """Streams the answer as Server-Sent Events, see `answer_event_stream`."""
+    return StreamingResponse(
+        answer_event_stream(request.query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@answer_router.post("/answer/batch")
+async def answer_batch(request: BatchRequest) -> StreamingResponse:
+    """Answers a batch of questions, streaming one JSON line per answer as soon as it is ready."""
+
+    async def _items() -> AsyncIterator[BatchQuery]:
+        for index, item in enumerate(request.items):
+            yield item if item.id is not None else item.model_copy(update={"id": str(index)})
+
+    async def _lines() -> AsyncIterator[str]:
+        async for result in run_batch(_items(), request.concurrency or batch_settings.BATCH_CONCURRENCY):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
@@ -1,18 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
 
 from src.api.schemas.query import ModeQuery
 from src.api.schemas.response import TaskCreationResponse, TaskStatusResponse
-from src.api.services.task_manager import task_manager
+from src.api.services.events import task_event_stream
+from src.api.services.scheduler import QueueFullError
+from src.api.services.task_manager import ResumeError, task_manager
+from src.models.governor import governor_stats
+from src.searches.cache import search_cache
 
 mode_router = APIRouter()
 
 
 @mode_router.post("/get-mode")
 async def enqueue_mode_detection(request: ModeQuery) -> TaskCreationResponse:
-    task_id = await task_manager.create_task(request.query, forced_mode=request.mode)
+    try:
+        task_id = await task_manager.create_task(request.query, forced_mode=request.mode)
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=429, detail="Too many queued tasks", headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
     return TaskCreationResponse(task_id=task_id)
 
 
+@mode_router.post("/tasks/{task_id}/resume")
+async def resume_task(task_id: str) -> TaskCreationResponse:
+    """Continues the interrupted run of a failed task in a new task, without repeating its completed steps."""
+    try:
+        new_task_id = await task_manager.resume_task(task_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Task not found") from exc
+    except ResumeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=429, detail="Too many queued tasks", headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
+    return TaskCreationResponse(task_id=new_task_id)
+
+
 @mode_router.get("/tasks/{task_id}")
 async def get_task(task_id: str) -> TaskStatusResponse:
     try:
@@ -20,3 +46,38 @@ async def get_task(task_id: str) -> TaskStatusResponse:
     except KeyError as exc:
         raise HTTPException(status_code=404, detail="Task not found") from exc
     return TaskStatusResponse(**payload)
+
+
+@mode_router.get("/tasks/{task_id}/events")
+async def stream_task_events(
+    task_id: str,
+    last_event_id: int = 0,
+    last_event_id_header: int | None = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """Streams task progress as Server-Sent Events, resuming after `Last-Event-ID` when reconnecting."""
+    try:
+        backlog, queue = await task_manager.subscribe(task_id, last_event_id_header or last_event_id)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Task not found") from exc
+    return StreamingResponse(
+        task_event_stream(task_id, backlog, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@mode_router.get("/task-manager")
+async def get_task_manager_stats() -> dict:
+    return task_manager.stats()
+
+
+@mode_router.get("/cache")
+async def get_cache_stats() -> dict:
+    from src.models.llm_cache import llm_cache  # pylint: disable=import-outside-toplevel
+
+    return {**search_cache.stats(), **llm_cache.stats()}
+
+
+@mode_router.get("/limits")
+async def get_limit_stats() -> dict:
+    return governor_stats()
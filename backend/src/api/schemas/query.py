@@ -1,6 +1,8 @@
-from typing import Literal
+from typing import List, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from src.config.batch import batch_settings
 
 
 class Query(BaseModel):
@@ -18,3 +20,21 @@ class ModeQuery(BaseModel):
 
     query: str
     mode: Literal["pro", "simple"] | None = None
+
+
+class BatchQuery(ModeQuery):
+    """One question of a batch, `id` defaults to its position in the batch."""
+
+    id: str | None = None
+
+
+class BatchRequest(BaseModel):
+    """Request schema for batch answering.
+
+    Attributes:
+        items: questions to answer, identical questions are answered once
+        concurrency: number of questions answered at the same time, at most and by default BATCH_CONCURRENCY
+    """
+
+    items: List[BatchQuery] = Field(min_length=1, max_length=batch_settings.BATCH_MAX_ITEMS)
+    concurrency: int | None = Field(default=None, ge=1, le=batch_settings.BATCH_CONCURRENCY)
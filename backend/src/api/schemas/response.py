@@ -43,3 +43,29 @@ class TaskStatusResponse(BaseModel):
     result: str | None = None
     error: str | None = None
     created_at: datetime
+    trace_id: str | None = None
+    thread_id: str | None = None
+    queue_position: int | None = None
+    queue_wait_seconds: float | None = None
+
+
+class BatchAnswer(BaseModel):
+    """Pydantic model for one answer of a batch.
+
+    Attributes:
+        id: id of the question in the batch
+        query: the question
+        answer: answer for the question, None if answering failed
+        router: the system mode used for the answer
+        error: the error answering failed with
+        elapsed_seconds: time spent answering the question
+        deduplicated: whether the answer was shared with an identical question of the batch
+    """
+
+    id: str
+    query: str
+    answer: str | None = None
+    router: Literal["pro", "simple"] | None = None
+    error: str | None = None
+    elapsed_seconds: float
+    deduplicated: bool = False
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import AsyncIterable, AsyncIterator, Dict, Literal, Optional, Set, Tuple
+from uuid import uuid4
+
+from src.api.schemas.query import BatchQuery
+from src.api.schemas.response import BatchAnswer
+from src.config.batch import batch_settings
+from src.graph.engine import engine
+from src.models.singleflight import flights
+from src.observability.tracing import span
+
+Run = Tuple[str, str, float]
+
+
+def query_key(query: str, mode: Optional[str]) -> str:
+    """Questions that differ only in case and whitespace, asked in the same mode, share one answer"""
+    return f"{mode or 'auto'}:{' '.join(query.lower().split())}"
+
+
+async def answer_query(query: str, mode: Literal["pro", "simple"] | None = None) -> Run:
+    """
+    Runs the router graph for one question, returns the answer, the mode used and the elapsed time.
+
+    Identical questions asked while one is being answered share its run (see `query_key`).
+    """
+    return await flights.run("answer", query_key(query, mode), lambda: _answer_query(query, mode))
+
+
+async def _answer_query(query: str, mode: Literal["pro", "simple"] | None) -> Run:
+    started = time.monotonic()
+    with span("answer", forced_mode=mode):
+        state = await engine.run(f"answer-{uuid4().hex}", {"input": query, "decision": mode or ""})
+    return state["output"], state["decision"], round(time.monotonic() - started, 3)
+
+
+async def run_batch(
+    items: AsyncIterable[BatchQuery],
+    concurrency: int = batch_settings.BATCH_CONCURRENCY,
+) -> AsyncIterator[BatchAnswer]:
+    """
+    Answers a stream of questions, at most `concurrency` at a time.
+
+    Items are read only as slots free up, so the input may be arbitrarily long. Every distinct
+    question is answered once: later identical items, in flight or finished, share its result.
+    Search and extract results are shared between questions through the search cache.
+
+    Args:
+        items: questions to answer, each needs an `id`.
+        concurrency: number of distinct questions answered at the same time.
+
+    Yields:
+        One answer per item, in completion order.
+    """
+    slots = asyncio.Semaphore(max(concurrency, 1))
+    runs: Dict[str, "asyncio.Task[Run]"] = {}
+    waiters: Set[asyncio.Task] = set()
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def _run(item: BatchQuery) -> Run:
+        try:
+            return await answer_query(item.query, item.mode)
+        finally:
+            slots.release()
+
+    async def _answer(item: BatchQuery, run: "asyncio.Task[Run]", deduplicated: bool) -> None:
+        started = time.monotonic()
+        try:
+            answer, router, elapsed = await asyncio.shield(run)
+        except Exception as exc:  # pylint: disable=broad-except
+            result = BatchAnswer(
+                id=item.id,
+                query=item.query,
+                error=str(exc) or repr(exc),
+                elapsed_seconds=round(time.monotonic() - started, 3),
+                deduplicated=deduplicated,
+            )
+        else:
+            result = BatchAnswer(
+                id=item.id,
+                query=item.query,
+                answer=answer,
+                router=router,
+                elapsed_seconds=elapsed,
+                deduplicated=deduplicated,
+            )
+        results.put_nowait(result)
+
+    async def _feed() -> None:
+        try:
+            async for item in items:
+                key = query_key(item.query, item.mode)
+                run = runs.get(key)
+                deduplicated = run is not None
+                if run is None:
+                    await slots.acquire()
+                    run = runs[key] = asyncio.create_task(_run(item))
+                waiter = asyncio.create_task(_answer(item, run, deduplicated))
+                waiters.add(waiter)
+                waiter.add_done_callback(waiters.discard)
+            while waiters:
+                await asyncio.gather(*list(waiters))
+        finally:
+            results.put_nowait(None)
+
+    feed = asyncio.create_task(_feed())
+    try:
+        while (result := await results.get()) is not None:
+            yield result
+        await feed
+    finally:
+        for task in (feed, *waiters, *runs.values()):
+            task.cancel()
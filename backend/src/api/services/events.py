@@ -0,0 +1,106 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+
+from src.api.services.task_manager import task_manager
+from src.api.services.task_records import TERMINAL_STATUSES
+from src.config.engine import engine_settings
+from src.graph.engine import engine
+from src.graph.streaming import stream_tokens
+from src.observability.tracing import span
+
+KEEPALIVE_SECONDS = 15.0
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    data = json.dumps(jsonable_encoder(event["data"]), ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+def _is_terminal(event: Dict[str, Any]) -> bool:
+    return event["event"] == "status" and event["data"].get("status") in TERMINAL_STATUSES
+
+
+async def task_event_stream(task_id: str, backlog: List[Dict[str, Any]], queue: asyncio.Queue) -> AsyncIterator[str]:
+    """
+    Renders task events as Server-Sent Events until the task reaches a terminal status.
+
+    Replays `backlog` first, then forwards live events from `queue`, sending a comment line every
+    KEEPALIVE_SECONDS of silence so proxies keep the connection open.
+    """
+    try:
+        for event in backlog:
+            yield format_event(event)
+            if _is_terminal(event):
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+            if _is_terminal(event):
+                return
+    finally:
+        await task_manager.unsubscribe(task_id, queue)
+
+
+async def answer_event_stream(query: str) -> AsyncIterator[str]:
+    """
+    Runs the router graph for `query` and renders its answer as Server-Sent Events.
+
+    Sends `token` events while drafts are generated, a `validation` event with the verdict on every
+    draft (`retrying` tells whether a revision follows), then an `answer` event with the final text
+    and mode (or an `error` event). Tokens carry the `attempt` of their draft, starting at 1, so
+    clients start over when it changes.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    draft = {"attempt": 1}
+
+    async def _token(text: str) -> None:
+        queue.put_nowait(("token", {"attempt": draft["attempt"], "text": text}))
+
+    async def _update(node: str, update: Dict[str, Any], _: Dict[str, Any]) -> None:
+        if node != "validator":
+            return
+        attempt = update["validation_attempts"]
+        result = update["validation_result"]
+        event = {
+            "attempt": attempt,
+            "result": result,
+            "feedback": update["validation_feedback"],
+            "retrying": result != "yes" and attempt < engine_settings.MAX_VALIDATION_ATTEMPTS,
+        }
+        queue.put_nowait(("validation", event))
+        draft["attempt"] = attempt + 1
+
+    async def _run() -> None:
+        try:
+            with stream_tokens(_token), span("answer", streamed=True):
+                state = await engine.run(f"answer-{uuid4().hex}", {"input": query, "decision": ""}, _update)
+            queue.put_nowait(("answer", {"answer": state["output"], "router": state["decision"]}))
+        except Exception as exc:  # pylint: disable=broad-except
+            queue.put_nowait(("error", {"error": str(exc)}))
+        finally:
+            queue.put_nowait(None)
+
+    run = asyncio.create_task(_run())
+    event_id = 0
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:
+                return
+            event_id += 1
+            yield format_event({"id": event_id, "event": item[0], "data": item[1]})
+    finally:
+        run.cancel()
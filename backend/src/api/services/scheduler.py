@@ -0,0 +1,146 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.config.tasks import task_settings
+
+Job = Callable[[], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler queue is at its maximum depth.
+
+    Attributes:
+        retry_after: suggested number of seconds before retrying
+    """
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Task queue is full, retry after {retry_after} s")
+        self.retry_after = retry_after
+
+
+class TaskScheduler:
+    """
+    Runs queued jobs on a fixed pool of workers.
+
+    Jobs wait in one queue per priority class and are dispatched by smooth weighted round-robin,
+    so a class with weight 3 gets three slots for every one of a class with weight 1 while both
+    have work, and no class starves. A class missing from the weights gets weight 1. Submitting
+    beyond `max_queue` waiting jobs is rejected.
+    """
+
+    def __init__(
+        self,
+        workers: int = task_settings.TASK_WORKERS,
+        max_queue: int = task_settings.TASK_QUEUE_MAX,
+        weights: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self._workers = workers
+        self._max_queue = max_queue
+        self._weights = dict(weights or task_settings.TASK_PRIORITY_WEIGHTS)
+        self._queues: Dict[str, Deque[Tuple[str, Job]]] = {name: deque() for name in self._weights}
+        self._credit: Dict[str, int] = {name: 0 for name in self._weights}
+        self._available: Optional[asyncio.Semaphore] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._avg_run_seconds = 30.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def submit(self, job_id: str, priority: str, job: Job) -> int:
+        """
+        Queues a job.
+
+        Args:
+            job_id: identifier used for position lookups.
+            priority: priority class, weighted 1 unless it has a configured weight.
+            job: coroutine function to run.
+
+        Returns:
+            1-based position of the job in its class queue.
+
+        Raises:
+            QueueFullError: the queue already holds `max_queue` jobs.
+        """
+        self.check_capacity()
+        self._ensure_workers()
+        if priority not in self._queues:
+            self._weights[priority] = 1
+            self._queues[priority] = deque()
+            self._credit[priority] = 0
+        queue = self._queues[priority]
+        queue.append((job_id, job))
+        self._available.release()
+        return len(queue)
+
+    def check_capacity(self) -> None:
+        """Raises QueueFullError when no more jobs can be queued"""
+        if self.queued >= self._max_queue:
+            raise QueueFullError(self._retry_after())
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position of a waiting job in its class queue, None once it has started"""
+        for queue in self._queues.values():
+            for index, (queued_id, _) in enumerate(queue):
+                if queued_id == job_id:
+                    return index + 1
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": self._workers,
+            "running": self._running,
+            "queued": {name: len(queue) for name, queue in self._queues.items()},
+            "max_queue": self._max_queue,
+            "avg_run_seconds": round(self._avg_run_seconds, 3),
+        }
+
+    async def close(self) -> None:
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def _ensure_workers(self) -> None:
+        if self._worker_tasks:
+            return
+        self._available = asyncio.Semaphore(0)
+        self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self._workers)]
+
+    def _next(self) -> Job:
+        total = 0
+        best = None
+        for name, queue in self._queues.items():
+            if not queue:
+                continue
+            self._credit[name] += self._weights[name]
+            total += self._weights[name]
+            if best is None or self._credit[name] > self._credit[best]:
+                best = name
+        self._credit[best] -= total
+        return self._queues[best].popleft()[1]
+
+    async def _work(self) -> None:
+        while True:
+            await self._available.acquire()
+            job = self._next()
+            self._running += 1
+            started = time.monotonic()
+            try:
+                await job()
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"Scheduled job failed: {exc!r}")
+            finally:
+                self._running -= 1
+                self._avg_run_seconds = 0.9 * self._avg_run_seconds + 0.1 * (time.monotonic() - started)
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self._avg_run_seconds * self.queued / self._workers))
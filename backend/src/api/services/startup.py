@@ -0,0 +1,111 @@
+import asyncio
+import importlib
+import sys
+import time
+from typing import Any, Awaitable, Dict, Literal, Optional
+
+from src.config.startup import startup_settings
+from src.graph.engine import engine
+from src.models.http_client import http_pool
+
+# Heaviest dependencies first, so each entry is charged only for what it adds
+WARMUP_MODULES = (
+    "langchain_openai",
+    "langgraph.graph",
+    "langchain.agents",
+    "langchain_tavily",
+    "tavily",
+    "src.graph.graph",
+    "src.graph.nodes",
+)
+
+
+def _build_clients() -> None:
+    # pylint: disable=import-outside-toplevel
+    from src.graph.pro_mode.schemas.facts import Facts
+    from src.graph.pro_mode.schemas.foreign_question import ForeignQuestion
+    from src.graph.pro_mode.schemas.questions import QuestionBreakdown, ResolvedQuestion
+    from src.graph.router.schemas.route import Route
+    from src.graph.validator.schemas.validate import Validate
+    from src.models.llm import structured_llm
+    from src.searches.extractor import get_tavily_client
+    from src.searches.simple.llm_with_search import get_llm_with_search
+
+    for schema in (Route, QuestionBreakdown, ResolvedQuestion, ForeignQuestion, Facts, Validate):
+        structured_llm(schema)
+    get_llm_with_search()
+    get_tavily_client()
+
+
+class Startup:
+    """
+    Runs the optional warm-up phase and reports its progress to the health check.
+
+    The warm-up imports the pipeline, builds the chat model, its structured-output runnables and
+    the search agent, compiles the router graph, opens its checkpoint store and the pooled HTTP
+    connections, so the first request does not pay for them. Every import and step is timed on its own.
+    """
+
+    def __init__(self) -> None:
+        self.status: Literal["starting", "ready", "failed"] = "starting"
+        self.error: Optional[str] = None
+        self._report: Dict[str, Dict[str, float]] = {"imports": {}, "steps": {}}
+        self._started = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if not startup_settings.STARTUP_WARMUP:
+            self.status = "ready"
+            return
+        self._task = asyncio.create_task(self._warm_up())
+
+    async def close(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+            "modules_loaded": len(sys.modules),
+            **self._report,
+        }
+
+    async def _warm_up(self) -> None:
+        started = time.monotonic()
+        try:
+            for module in WARMUP_MODULES:
+                await self._timed("imports", module, asyncio.to_thread(importlib.import_module, module))
+            await self._timed("steps", "clients", asyncio.to_thread(_build_clients))
+            await self._timed("steps", "graph", engine.graph())
+            await self._timed("steps", "http", self._warm_up_http())
+        except Exception as exc:  # pylint: disable=broad-except
+            self.status = "failed"
+            self.error = repr(exc)
+            print(f"Warm-up failed: {exc!r}")
+            return
+
+        self.status = "ready"
+        slowest = sorted(self._report["imports"].items(), key=lambda item: item[1], reverse=True)
+        print(
+            f"Warm-up finished in {time.monotonic() - started:.2f} s, imports: "
+            + ", ".join(f"{module} {seconds:.2f} s" for module, seconds in slowest)
+        )
+
+    async def _timed(self, section: str, name: str, step: Awaitable[Any]) -> None:
+        started = time.monotonic()
+        await step
+        self._report[section][name] = round(time.monotonic() - started, 3)
+
+    @staticmethod
+    async def _warm_up_http() -> None:
+        # pylint: disable=import-outside-toplevel
+        from src.config.settings import get_llm_settings
+        from src.searches.extractor import get_tavily_client
+
+        await http_pool.warm_up([get_llm_settings().LLM_HOST, get_tavily_client().base_url])
+
+
+startup = Startup()
@@ -1,129 +1,171 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, field
+import copy
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Set
 from uuid import uuid4
 
-from src.graph.nodes.simple import simple_mode
-from src.graph.pro_mode.aggregator import aggregator
-from src.graph.pro_mode.decomposer import decomposer
-from src.graph.pro_mode.facts_retriever import retrieve_facts
-from src.graph.router.router import llm_call_router
+from src.api.services.batch import query_key
+from src.api.services.scheduler import QueueFullError, TaskScheduler
+from src.api.services.task_records import TERMINAL_STATUSES, TaskDetails, TaskRecord, TaskStatus
+from src.api.services.task_store import InMemoryTaskStore, create_task_store
+from src.config.engine import engine_settings
+from src.config.tasks import task_settings
+from src.graph.engine import engine
+from src.graph.pro_mode.question_graph import question_dependencies
 from src.graph.states.state import State
-from src.graph.validator.validator import define_validating_agent, validator_answer
+from src.graph.streaming import stream_tokens
+from src.observability.metrics import TASK_QUEUE_DEPTH, TASKS, TASKS_COALESCED, TASKS_IN_FLIGHT
+from src.observability.tracing import span
 
-TaskStatus = Literal["pending", "running", "succeeded", "failed"]
 
+class ResumeError(Exception):
+    """Raised when a task cannot be resumed: it is still running or its run has nothing left to do"""
 
-@dataclass
-class TaskDetails:
-    mode: Optional[Literal["pro", "simple"]] = None
-    thoughts: str = ""
-    thoughts_data: Dict[str, Any] = field(default_factory=lambda: {"attempts": [], "current_attempt": 0})
 
-    def append_thought(self, message: str) -> None:
-        self.thoughts = f"{self.thoughts}\n{message}" if self.thoughts else message
-
-    def add_step(
-        self,
-        attempt_number: int,
-        step_type: str,
-        message: str = "",
-        data: Optional[Dict[str, Any]] = None,
-    ) -> None:
-        """Add a structured step to thoughts_data"""
-        if attempt_number > len(self.thoughts_data["attempts"]):
-            self.thoughts_data["attempts"].append(
-                {
-                    "number": attempt_number,
-                    "status": "in_progress",
-                    "steps": [],
-                }
-            )
-            self.thoughts_data["current_attempt"] = attempt_number
+class TaskManager:
+    """
+    Runs pipelines in the background and records their progress in a task store.
 
-        if not self.thoughts_data["attempts"]:
-            return
+    Each task has a single writer, its own pipeline coroutine, and every update is applied
+    synchronously between awaits, so records need no lock on the event loop. Pipelines run on the
+    scheduler's bounded worker pool; forced simple-mode tasks get the largest share of it.
 
-        current_attempt = self.thoughts_data["attempts"][-1]
-        step = {
-            "type": step_type,
-            "message": message,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-        if data:
-            step["data"] = data
-        current_attempt["steps"].append(step)
-
-    def update_attempt_status(self, attempt_number: int, status: str) -> None:
-        """Update attempt status: in_progress, completed, failed"""
-        if attempt_number <= len(self.thoughts_data["attempts"]):
-            self.thoughts_data["attempts"][attempt_number - 1]["status"] = status
-
-
-@dataclass
-class TaskRecord:
-    task_id: str
-    status: TaskStatus
-    created_at: datetime
-    updated_at: datetime
-    details: Optional[TaskDetails] = None
-    result: Optional[str] = None
-    error: Optional[str] = None
-
-    def to_response_payload(self) -> Dict[str, Any]:
-        return {
-            "task_id": self.task_id,
-            "status": self.status,
-            "details": (
-                None
-                if self.details is None or self.details.mode is None
-                else {
-                    "mode": self.details.mode,
-                    "thoughts": self.details.thoughts,
-                    "thoughts_data": self.details.thoughts_data,
-                }
-            ),
-            "result": self.result,
-            "error": self.error,
-            "created_at": self.created_at,
-        }
+    The pipeline is the checkpointed router graph (see `src.graph.engine`), run on a thread named
+    after the task; the progress of a task is recorded from the updates of its graph nodes.
 
+    A task created while an identical one (same normalized query and forced mode) is pending or
+    running joins it instead of running its own pipeline: it keeps its own id, starts from a copy of
+    the progress so far and receives every later update, so its events and result are the same.
+    Tasks are only coalesced within one process.
+    """
 
-class TaskManager:
-    def __init__(self, max_validation_attempts: int = 3) -> None:
-        self._tasks: Dict[str, TaskRecord] = {}
-        self._lock = asyncio.Lock()
-        self._max_validation_attempts = max_validation_attempts
+    def __init__(
+        self,
+        store: Optional[InMemoryTaskStore] = None,
+        scheduler: Optional[TaskScheduler] = None,
+    ) -> None:
+        self._store = store if store is not None else create_task_store()
+        self._scheduler = scheduler if scheduler is not None else TaskScheduler()
+        self._threads: Set[str] = set()
+        self._leaders: Dict[str, TaskRecord] = {}
+        self._followers: Dict[str, List[TaskRecord]] = {}
+        self.coalesced = 0
 
     async def create_task(
         self,
         query: str,
         forced_mode: Literal["pro", "simple"] | None = None,
+        thread_id: Optional[str] = None,
     ) -> str:
         task_id = uuid4().hex
         now = datetime.now(timezone.utc)
+        key = query_key(query, forced_mode)
+        leader = self._leaders.get(key)
+        if (
+            leader is not None
+            and thread_id is None
+            and task_settings.TASK_COALESCING
+            and leader.status not in TERMINAL_STATUSES
+        ):
+            await self._follow(task_id, leader, now)
+            return task_id
+
         record = TaskRecord(
             task_id=task_id,
             status="pending",
             created_at=now,
             updated_at=now,
+            thread_id=thread_id or task_id,
         )
 
-        async with self._lock:
-            self._tasks[task_id] = record
-
-        asyncio.create_task(self._process_task(task_id, query, forced_mode))
+        self._scheduler.check_capacity()
+        # Registered before the first await, so identical tasks created meanwhile join this one
+        if leader is None or leader.status in TERMINAL_STATUSES:
+            self._leaders[key] = record
+        self._followers[task_id] = []
+        try:
+            await self._store.add(record)
+            self._scheduler.submit(
+                task_id, forced_mode or "auto", lambda: self._process_task(task_id, query, forced_mode)
+            )
+        except BaseException as exc:
+            error = "Task queue is full." if isinstance(exc, QueueFullError) else "Task could not be started."
+            try:
+                await self._update_task(task_id, status="failed", error=error)
+            finally:
+                self._release(task_id, key)
+            raise
+        self._threads.add(record.thread_id)
         return task_id
 
+    async def resume_task(self, task_id: str) -> str:
+        """
+        Starts a new task that continues the interrupted run of a failed or orphaned task.
+
+        The new task runs on the old task's thread, so it resumes after the last node the old run
+        completed. Works for tasks of a process that has since restarted as long as the task store
+        and the checkpoints are shared (TASK_STORE=sqlite, CHECKPOINTER=sqlite).
+
+        Raises:
+            KeyError: the task is unknown.
+            ResumeError: the run is still going in this process or has nothing left to resume.
+
+        Returns:
+            Id of the new task.
+        """
+        payload = await self._store.get_payload(task_id)
+        thread_id = payload.get("thread_id") or task_id
+        if thread_id in self._threads:
+            raise ResumeError("The task is still running.")
+        checkpoint = await engine.checkpoint(thread_id)
+        if checkpoint is None or not checkpoint["next"]:
+            raise ResumeError("The task has no interrupted run to resume.")
+        values = checkpoint["values"]
+        return await self.create_task(values["input"], forced_mode=values.get("decision") or None, thread_id=thread_id)
+
     async def get_task_payload(self, task_id: str) -> Dict[str, Any]:
-        async with self._lock:
-            task = self._tasks.get(task_id)
-            if task is None:
-                raise KeyError(task_id)
-            return task.to_response_payload()
+        payload = await self._store.get_payload(task_id)
+        payload["queue_position"] = self._scheduler.position(self._leader(task_id))
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._store.stats(),
+            "scheduler": self._scheduler.stats(),
+            "engine": engine.stats(),
+            "coalesced": self.coalesced,
+        }
+
+    @property
+    def queued(self) -> int:
+        return self._scheduler.queued
+
+    @property
+    def running(self) -> int:
+        return self._scheduler.running
+
+    async def subscribe(self, task_id: str, last_event_id: int = 0) -> tuple[List[Dict[str, Any]], asyncio.Queue]:
+        """
+        Subscribes to the events of a task.
+
+        Args:
+            task_id: id of the task.
+            last_event_id: id of the last event the client has already received, 0 for all events.
+
+        Returns:
+            Events recorded after `last_event_id` and a queue that receives every later event.
+        """
+        return await self._store.subscribe(task_id, last_event_id)
+
+    async def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        await self._store.unsubscribe(task_id, queue)
+
+    async def close(self) -> None:
+        await self._scheduler.close()
+        await self._store.close()
+        await engine.close()
 
     async def _process_task(
         self,
@@ -131,191 +173,343 @@ class TaskManager:
         query: str,
         forced_mode: Literal["pro", "simple"] | None,
     ) -> None:
+        task = self._store.record(task_id)
+        with span("task", task_id=task_id, forced_mode=forced_mode) as root:
+            for record in self._records(task_id):
+                record.started_at = datetime.now(timezone.utc)
+                record.trace_id = root.trace_id
+            try:
+                await self._run_task(task_id, query, forced_mode)
+            finally:
+                followers = self._release(task_id, query_key(query, forced_mode))
+            root.set(status=task.status, mode=task.details.mode if task.details else None, coalesced=len(followers))
+
+    async def _follow(self, task_id: str, leader: TaskRecord, now: datetime) -> None:
+        """Adds a task that shares the pipeline of `leader`, starting from a copy of its progress"""
+        record = TaskRecord(
+            task_id=task_id,
+            status=leader.status,
+            created_at=now,
+            updated_at=now,
+            started_at=leader.started_at,
+            details=copy.deepcopy(leader.details),
+            trace_id=leader.trace_id,
+            thread_id=leader.thread_id,
+            events=copy.deepcopy(leader.events),
+        )
+        # Joined before the first await, so no update of the leader is missed
+        self._followers[leader.task_id].append(record)
+        self.coalesced += 1
+        TASKS_COALESCED.inc()
+        await self._store.add(record)
+
+    def _release(self, task_id: str, key: str) -> List[TaskRecord]:
+        """Lets later identical tasks run their own pipeline once this one has finished, returns its followers"""
+        leader = self._leaders.get(key)
+        if leader is not None and leader.task_id == task_id:
+            del self._leaders[key]
+        return self._followers.pop(task_id, [])
+
+    def _leader(self, task_id: str) -> str:
+        """The task whose pipeline `task_id` runs on: the task itself unless it joined another one"""
+        return next(
+            (
+                leader
+                for leader, followers in self._followers.items()
+                if any(record.task_id == task_id for record in followers)
+            ),
+            task_id,
+        )
+
+    def _records(self, task_id: str) -> List[TaskRecord]:
+        """The record of a task followed by the records of the tasks that joined it"""
+        return [self._store.record(task_id), *self._followers.get(task_id, ())]
+
+    async def _run_task(
+        self,
+        task_id: str,
+        query: str,
+        forced_mode: Literal["pro", "simple"] | None,
+    ) -> None:
+        task = self._store.record(task_id)
         await self._update_task(task_id, status="running")
         state: State = {
             "input": query,
-            "decision": "",
+            "decision": forced_mode or "",
             "output": "",
             "validation_attempts": 0,
             "validation_result": "",
         }
+        checkpoint = await engine.checkpoint(task.thread_id)
+        if checkpoint is not None and checkpoint["next"]:
+            state = checkpoint["values"]
+        attempt = {"number": state.get("validation_attempts", 0) + 1}
+        if checkpoint is not None and checkpoint["next"]:
+            await self._report_resume(task_id, attempt["number"], state, checkpoint["next"])
+
+        async def _publish_token(text: str) -> None:
+            await self._publish_token(task_id, attempt["number"], text)
+
+        async def _on_update(node: str, update: Dict[str, Any], before: State) -> None:
+            await self._report(task_id, forced_mode, node, update, before)
+            if "validation_attempts" in update:
+                attempt["number"] = update["validation_attempts"] + 1
+
+        async def _on_retry(resume: int, exc: BaseException) -> None:
+            retry_msg = (
+                f"[Attempt {attempt['number']}] ERROR: {exc}. Resuming from the last completed step "
+                f"({resume}/{engine_settings.RUN_MAX_RESUMES})..."
+            )
+            await self._append_thought(task_id, retry_msg)
+            await self._add_step(task_id, attempt["number"], "error", retry_msg)
 
         try:
-            success, output = await self._execute_pipeline(task_id, state, forced_mode)
+            with stream_tokens(_publish_token):
+                final = await engine.run(task.thread_id, state, on_update=_on_update, on_retry=_on_retry)
         except Exception as exc:  # pylint: disable=broad-except
-            await self._update_task(
-                task_id,
-                status="failed",
-                error=str(exc),
-            )
+            mode = task.details.mode if task.details else None
+            error_msg = f"[Attempt {attempt['number']}] ERROR in {(mode or 'auto').upper()} mode: {exc}"
+            await self._append_thought(task_id, error_msg)
+            await self._add_step(task_id, attempt["number"], "error", error_msg)
+            await self._update_attempt_status(task_id, attempt["number"], "failed")
+            TASKS.labels(mode or forced_mode or "auto", "failed").inc()
+            await self._update_task(task_id, status="failed", error=str(exc))
+            return
+        finally:
+            self._threads.discard(task.thread_id)
+
+        # An answer the validator never accepted is still returned once the attempts are used up
+        output = final.get("output")
+        TASKS.labels(final.get("decision") or "auto", "succeeded" if output else "failed").inc()
+        if output:
+            await self._update_task(task_id, status="succeeded", result=output)
         else:
-            if success and output is not None:
-                await self._update_task(task_id, status="succeeded", result=output)
-            else:
-                await self._update_task(
-                    task_id,
-                    status="failed",
-                    error="Validation failed after maximum attempts.",
-                )
+            await self._update_task(task_id, status="failed", error="Validation failed after maximum attempts.")
 
-    async def _execute_pipeline(
+    async def _report(
         self,
         task_id: str,
-        state: State,
         forced_mode: Literal["pro", "simple"] | None,
-    ) -> tuple[bool, Optional[str]]:
-        validation_result: Optional[str] = None
+        node: str,
+        update: Dict[str, Any],
+        before: State,
+    ) -> None:
+        """Records a completed graph node as thoughts, steps and events of the task"""
+        attempt_number = before.get("validation_attempts", 0) + 1
+        state = {**before, **update}
 
-        while state["validation_attempts"] < self._max_validation_attempts:
-            attempt_number = state["validation_attempts"] + 1
+        if node == "llm_call_router":
+            decision = update["decision"]
             if forced_mode is None:
-                decision_block = await llm_call_router(state)
-                decision = decision_block["decision"]
                 router_message = f"[Attempt {attempt_number}] Routed query to {decision.upper()} mode."
             else:
-                decision = forced_mode
                 router_message = f"[Attempt {attempt_number}] Forced mode set to {decision.upper()}."
-            state["decision"] = decision
-
-            await self._set_mode(task_id, decision)
-            await self._append_thought(task_id, router_message)
-            await self._add_step(task_id, attempt_number, "mode", router_message)
-
-            if decision == "pro":
-                try:
-                    output_block = await decomposer(state)
-                    state.update(output_block)
-                    
-                    if "decomposition_info" in output_block:
-                        decomp_info = output_block["decomposition_info"]
-                        decomposition_text = f"[Attempt {attempt_number}] Декомпозиция вопроса:\n"
-                        decomposition_text += f"Логика: {decomp_info['reasoning']}\n"
-                        decomposition_text += f"Количество подвопросов: {decomp_info['total_subquestions']}\n"
-                        decomposition_text += "Подвопросы:\n"
-                        for i, subq in enumerate(decomp_info["subquestions"], 1):
-                            decomposition_text += f"  {i}. {subq.text}\n"
-                        await self._append_thought(task_id, decomposition_text)
-                        
-                        decomposition_data = {
-                            "reasoning": decomp_info["reasoning"],
-                            "total_subquestions": decomp_info["total_subquestions"],
-                            "subquestions": [
-                                {"number": i + 1, "text": subq.text}
-                                for i, subq in enumerate(decomp_info["subquestions"])
-                            ],
-                        }
-                        await self._add_step(
-                            task_id,
-                            attempt_number,
-                            "decomposition",
-                            "Декомпозиция вопроса",
-                            decomposition_data,
-                        )
-                    else:
-                        warning_msg = f"[Attempt {attempt_number}] WARNING: decomposition_info not found in output_block"
-                        await self._append_thought(task_id, warning_msg)
-                        await self._add_step(task_id, attempt_number, "warning", warning_msg)
-                    
-                    progress_msg = f"[Attempt {attempt_number}] Retrieving facts for subquestions..."
-                    await self._append_thought(task_id, progress_msg)
-                    await self._add_step(task_id, attempt_number, "progress", progress_msg)
-                    
-                    facts_block = await retrieve_facts(state)
-                    state.update(facts_block)
-                    
-                    facts_count = len(state.get("facts", []))
-                    facts_msg = f"[Attempt {attempt_number}] Facts retrieved: {facts_count} fact sets collected."
-                    await self._append_thought(task_id, facts_msg)
-                    await self._add_step(task_id, attempt_number, "progress", facts_msg)
-                    
-                    agg_msg = f"[Attempt {attempt_number}] Aggregating facts into final answer..."
-                    await self._append_thought(task_id, agg_msg)
-                    await self._add_step(task_id, attempt_number, "progress", agg_msg)
-                    
-                    aggregator_block = await aggregator(state)
-                    state.update(aggregator_block)
-                    
-                    success_msg = f"[Attempt {attempt_number}] Answer synthesized successfully."
-                    await self._append_thought(task_id, success_msg)
-                    await self._add_step(task_id, attempt_number, "completion", success_msg)
-                    
-                    if not state.get("output"):
-                        warning_msg = f"[Attempt {attempt_number}] WARNING: state['output'] is empty after aggregation"
-                        await self._append_thought(task_id, warning_msg)
-                        await self._add_step(task_id, attempt_number, "warning", warning_msg)
-                    
-                    final_msg = f"[Attempt {attempt_number}] Pro mode collected and synthesized information."
-                    await self._append_thought(task_id, final_msg)
-                    await self._add_step(task_id, attempt_number, "completion", final_msg)
-                except Exception as e:
-                    error_msg = f"[Attempt {attempt_number}] ERROR in pro mode: {str(e)}"
-                    await self._append_thought(task_id, error_msg)
-                    await self._add_step(task_id, attempt_number, "error", error_msg)
-                    async with self._lock:
-                        task = self._tasks[task_id]
-                        if task.details:
-                            task.details.update_attempt_status(attempt_number, "failed")
-                    raise
+            await self._start_attempt(task_id, attempt_number, decision, router_message)
+
+        elif node == "pro":
+            if "decomposition_info" in update:
+                decomp_info = update["decomposition_info"]
+                decomposition_text = f"[Attempt {attempt_number}] Декомпозиция вопроса:\n"
+                decomposition_text += f"Логика: {decomp_info['reasoning']}\n"
+                decomposition_text += f"Количество подвопросов: {decomp_info['total_subquestions']}\n"
+                decomposition_text += "Подвопросы:\n"
+                dependencies = question_dependencies(decomp_info["subquestions"])
+                for i, subq in enumerate(decomp_info["subquestions"], 1):
+                    decomposition_text += f"  {i}. {subq.text}"
+                    if dependencies[i - 1]:
+                        decomposition_text += f" (после {', '.join(str(j + 1) for j in dependencies[i - 1])})"
+                    decomposition_text += "\n"
+                await self._append_thought(task_id, decomposition_text)
+
+                decomposition_data = {
+                    "reasoning": decomp_info["reasoning"],
+                    "total_subquestions": decomp_info["total_subquestions"],
+                    "subquestions": [
+                        {"number": i + 1, "text": subq.text, "depends_on": [j + 1 for j in dependencies[i]]}
+                        for i, subq in enumerate(decomp_info["subquestions"])
+                    ],
+                }
+                await self._add_step(
+                    task_id,
+                    attempt_number,
+                    "decomposition",
+                    "Декомпозиция вопроса",
+                    decomposition_data,
+                )
             else:
-                output_block = await simple_mode(state)
-                state.update(output_block)
-                simple_msg = f"[Attempt {attempt_number}] Simple mode generated a direct answer."
-                await self._append_thought(task_id, simple_msg)
-                await self._add_step(task_id, attempt_number, "completion", simple_msg)
-
-            validation_block = await define_validating_agent(state)
-            state.update(validation_block)
-            state["validation_attempts"] += 1
-
-            validation_result = validator_answer(state)
-            validator_msg = f"[Attempt {attempt_number}] Validator response: {validation_result}."
-            await self._append_thought(task_id, validator_msg)
-            await self._add_step(task_id, attempt_number, "validation", validator_msg)
-
-            if validation_result == "yes":
-                async with self._lock:
-                    task = self._tasks[task_id]
-                    if task.details:
-                        task.details.update_attempt_status(attempt_number, "completed")
-                return True, state["output"]
-
-            if state["validation_attempts"] >= self._max_validation_attempts:
-                max_attempts_msg = "Reached maximum validation attempts. Returning last draft."
-                await self._append_thought(task_id, max_attempts_msg)
-                await self._add_step(task_id, attempt_number, "warning", max_attempts_msg)
-                async with self._lock:
-                    task = self._tasks[task_id]
-                    if task.details:
-                        task.details.update_attempt_status(attempt_number, "completed")
-                last_output = state.get("output")
-                if last_output:
-                    return True, last_output
-                else:
-                    return False, None
-
-            retry_msg = "Validator requested another attempt. Retrying..."
-            await self._append_thought(task_id, retry_msg)
-            await self._add_step(task_id, attempt_number, "progress", retry_msg)
+                warning_msg = f"[Attempt {attempt_number}] WARNING: decomposition_info not found in output_block"
+                await self._append_thought(task_id, warning_msg)
+                await self._add_step(task_id, attempt_number, "warning", warning_msg)
+
+            progress_msg = f"[Attempt {attempt_number}] Retrieving facts for subquestions..."
+            await self._append_thought(task_id, progress_msg)
+            await self._add_step(task_id, attempt_number, "progress", progress_msg)
+
+        elif node == "retrieve_facts":
+            asked = [subq.text for subq in before.get("sub_queries", [])]
+            resolved = [
+                f"  {i}. {subq.text}"
+                for i, (text, subq) in enumerate(zip(asked, state["sub_queries"]), 1)
+                if subq.text != text
+            ]
+            if resolved:
+                resolved_msg = f"[Attempt {attempt_number}] Уточнённые подвопросы:\n" + "\n".join(resolved)
+                await self._append_thought(task_id, resolved_msg)
+
+            facts_count = len(state.get("facts", []))
+            facts_info = state.get("facts_info", {})
+            pages_succeeded = facts_info.get("pages_succeeded", facts_count)
+            pages_total = facts_info.get("pages_total", facts_count)
+            facts_msg = (
+                f"[Attempt {attempt_number}] Facts retrieved: {facts_count} fact sets collected "
+                f"from {pages_succeeded}/{pages_total} pages."
+            )
+            await self._append_thought(task_id, facts_msg)
+            await self._add_step(task_id, attempt_number, "progress", facts_msg, dict(facts_info) or None)
+
+            agg_msg = f"[Attempt {attempt_number}] Aggregating facts into final answer..."
+            await self._append_thought(task_id, agg_msg)
+            await self._add_step(task_id, attempt_number, "progress", agg_msg)
+
+        elif node == "retrieve_missing_facts":
+            facts_info = state.get("facts_info", {})
+            facts_msg = (
+                f"[Attempt {attempt_number}] Additional facts retrieved from "
+                f"{facts_info.get('pages_succeeded', 0)}/{facts_info.get('pages_total', 0)} new pages."
+            )
+            await self._append_thought(task_id, facts_msg)
+            await self._add_step(task_id, attempt_number, "progress", facts_msg, dict(facts_info) or None)
+
+            agg_msg = f"[Attempt {attempt_number}] Revising the answer with the validator's feedback..."
+            await self._append_thought(task_id, agg_msg)
+            await self._add_step(task_id, attempt_number, "progress", agg_msg)
+
+        elif node == "aggregator" and attempt_number > 1:
+            success_msg = f"[Attempt {attempt_number}] Answer revised."
+            await self._append_thought(task_id, success_msg)
+            await self._add_step(task_id, attempt_number, "completion", success_msg)
+
+        elif node == "aggregator":
+            success_msg = f"[Attempt {attempt_number}] Answer synthesized successfully."
+            await self._append_thought(task_id, success_msg)
+            await self._add_step(task_id, attempt_number, "completion", success_msg)
+
+            if not state.get("output"):
+                warning_msg = f"[Attempt {attempt_number}] WARNING: state['output'] is empty after aggregation"
+                await self._append_thought(task_id, warning_msg)
+                await self._add_step(task_id, attempt_number, "warning", warning_msg)
+
+            final_msg = f"[Attempt {attempt_number}] Pro mode collected and synthesized information."
+            await self._append_thought(task_id, final_msg)
+            await self._add_step(task_id, attempt_number, "completion", final_msg)
+
+        elif node == "simple":
+            simple_msg = f"[Attempt {attempt_number}] Simple mode generated a direct answer."
+            await self._append_thought(task_id, simple_msg)
+            await self._add_step(task_id, attempt_number, "completion", simple_msg)
+
+        elif node == "validator":
+            await self._report_validation(task_id, attempt_number, state)
+
+    async def _report_validation(self, task_id: str, attempt_number: int, state: State) -> None:
+        """Records the validator's verdict and, on a rejection, announces the next attempt"""
+        validation_result = state.get("validation_result") or None
+        validator_msg = f"[Attempt {attempt_number}] Validator response: {validation_result}."
+        await self._append_thought(task_id, validator_msg)
+        await self._add_step(task_id, attempt_number, "validation", validator_msg)
+        retrying = validation_result != "yes" and state["validation_attempts"] < engine_settings.MAX_VALIDATION_ATTEMPTS
+        await self._publish_validation(task_id, attempt_number, validation_result, retrying)
+
+        if validation_result == "yes":
+            await self._update_attempt_status(task_id, attempt_number, "completed")
+            return
+
+        if not retrying:
+            max_attempts_msg = "Reached maximum validation attempts. Returning last draft."
+            await self._append_thought(task_id, max_attempts_msg)
+            await self._add_step(task_id, attempt_number, "warning", max_attempts_msg)
+            await self._update_attempt_status(task_id, attempt_number, "completed")
+            return
 
-        return validation_result == "yes", state.get("output")
+        retry_msg = "Validator requested another attempt. Retrying..."
+        await self._append_thought(task_id, retry_msg)
+        await self._add_step(task_id, attempt_number, "progress", retry_msg)
+
+        decision = state["decision"]
+        attempt_number += 1
+        router_message = (
+            f"[Attempt {attempt_number}] Revising the {decision.upper()} mode answer, "
+            "reusing the work of previous attempts."
+        )
+        await self._start_attempt(task_id, attempt_number, decision, router_message)
+        if decision != "pro":
+            return
+        if state.get("missing_information"):
+            missing_msg = f"[Attempt {attempt_number}] Researching missing information: " + "; ".join(
+                state["missing_information"]
+            )
+            await self._append_thought(task_id, missing_msg)
+            await self._add_step(task_id, attempt_number, "progress", missing_msg)
+        else:
+            agg_msg = f"[Attempt {attempt_number}] Revising the answer with the validator's feedback..."
+            await self._append_thought(task_id, agg_msg)
+            await self._add_step(task_id, attempt_number, "progress", agg_msg)
+
+    async def _report_resume(self, task_id: str, attempt_number: int, state: State, next_nodes: List[str]) -> None:
+        if state.get("decision"):
+            await self._set_mode(task_id, state["decision"])
+        resume_msg = (
+            f"[Attempt {attempt_number}] Resuming an interrupted run before: {', '.join(next_nodes)}. "
+            "Completed steps are not repeated."
+        )
+        await self._append_thought(task_id, resume_msg)
+        await self._add_step(task_id, attempt_number, "progress", resume_msg)
+
+    async def _start_attempt(
+        self, task_id: str, attempt_number: int, decision: Literal["pro", "simple"], message: str
+    ) -> None:
+        await self._set_mode(task_id, decision)
+        await self._append_thought(task_id, message)
+        await self._add_step(task_id, attempt_number, "mode", message)
 
     async def _set_mode(self, task_id: str, mode: Literal["pro", "simple"]) -> None:
-        async with self._lock:
-            task = self._tasks[task_id]
+        for task in self._records(task_id):
             if task.details is None:
                 task.details = TaskDetails(mode=mode)
             else:
                 task.details.mode = mode
             task.updated_at = datetime.now(timezone.utc)
+            task.publish("mode", {"mode": mode})
+            await self._store.changed(task)
+
+    async def _publish_token(self, task_id: str, attempt_number: int, text: str) -> None:
+        """
+        Streams a chunk of the answer draft of an attempt to the task's live subscribers.
+
+        Tokens are not kept in the task's events or the store, so they cost no memory once sent; a
+        client that connects later gets the answer from the final status event. With the SQLite
+        store only subscribers in the process running the task receive them.
+        """
+        for task in self._records(task_id):
+            task.broadcast("token", {"attempt": attempt_number, "text": text})
+
+    async def _publish_validation(
+        self, task_id: str, attempt_number: int, result: Optional[str], retrying: bool
+    ) -> None:
+        """Marks the streamed draft of an attempt as validated, or as replaced by a retry"""
+        for task in self._records(task_id):
+            task.publish("validation", {"attempt": attempt_number, "result": result, "retrying": retrying})
+            await self._store.changed(task)
 
     async def _append_thought(self, task_id: str, message: str) -> None:
-        async with self._lock:
-            task = self._tasks[task_id]
+        for task in self._records(task_id):
             if task.details is None:
                 task.details = TaskDetails(thoughts=message)
             else:
                 task.details.append_thought(message)
             task.updated_at = datetime.now(timezone.utc)
+            task.publish("thought", {"message": message})
+            await self._store.changed(task)
 
     async def _add_step(
         self,
@@ -326,12 +520,20 @@ class TaskManager:
         data: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Add a structured step to thoughts_data"""
-        async with self._lock:
-            task = self._tasks[task_id]
+        for task in self._records(task_id):
             if task.details is None:
                 task.details = TaskDetails()
-            task.details.add_step(attempt_number, step_type, message, data)
+            step = task.details.add_step(attempt_number, step_type, message, data)
             task.updated_at = datetime.now(timezone.utc)
+            if step is not None:
+                task.publish("step", {"attempt": attempt_number, **step})
+            await self._store.changed(task)
+
+    async def _update_attempt_status(self, task_id: str, attempt_number: int, status: str) -> None:
+        for task in self._records(task_id):
+            if task.details:
+                task.details.update_attempt_status(attempt_number, status)
+                await self._store.changed(task)
 
     async def _update_task(
         self,
@@ -341,8 +543,7 @@ class TaskManager:
         result: Optional[str] = None,
         error: Optional[str] = None,
     ) -> None:
-        async with self._lock:
-            task = self._tasks[task_id]
+        for task in self._records(task_id):
             if status is not None:
                 task.status = status
             if result is not None:
@@ -350,6 +551,13 @@ class TaskManager:
             if error is not None:
                 task.error = error
             task.updated_at = datetime.now(timezone.utc)
+            if task.status in TERMINAL_STATUSES:
+                task.publish("status", task.to_response_payload())
+            else:
+                task.publish("status", {"status": task.status})
+            await self._store.changed(task)
 
 
 task_manager = TaskManager()
+TASK_QUEUE_DEPTH.set_function(lambda: task_manager.queued)
+TASKS_IN_FLIGHT.set_function(lambda: task_manager.running)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional
+
+TaskStatus = Literal["pending", "running", "succeeded", "failed"]
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+@dataclass(slots=True)
+class TaskDetails:
+    mode: Optional[Literal["pro", "simple"]] = None
+    thoughts: str = ""
+    thoughts_data: Dict[str, Any] = field(default_factory=lambda: {"attempts": [], "current_attempt": 0})
+
+    def append_thought(self, message: str) -> None:
+        self.thoughts = f"{self.thoughts}\n{message}" if self.thoughts else message
+
+    def add_step(
+        self,
+        attempt_number: int,
+        step_type: str,
+        message: str = "",
+        data: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Add a structured step to thoughts_data"""
+        if attempt_number > len(self.thoughts_data["attempts"]):
+            self.thoughts_data["attempts"].append(
+                {
+                    "number": attempt_number,
+                    "status": "in_progress",
+                    "steps": [],
+                }
+            )
+            self.thoughts_data["current_attempt"] = attempt_number
+
+        if not self.thoughts_data["attempts"]:
+            return None
+
+        current_attempt = self.thoughts_data["attempts"][-1]
+        step = {
+            "type": step_type,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        if data:
+            step["data"] = data
+        current_attempt["steps"].append(step)
+        return step
+
+    def update_attempt_status(self, attempt_number: int, status: str) -> None:
+        """Update attempt status: in_progress, completed, failed"""
+        if attempt_number <= len(self.thoughts_data["attempts"]):
+            self.thoughts_data["attempts"][attempt_number - 1]["status"] = status
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    task_id: str
+    status: TaskStatus
+    created_at: datetime
+    updated_at: datetime
+    started_at: Optional[datetime] = None
+    details: Optional[TaskDetails] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    trace_id: Optional[str] = None
+    thread_id: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+
+    def approx_size(self) -> int:
+        """Rough number of bytes held by the task's text and events, for memory metrics"""
+        size = len(self.result or "") + len(self.error or "")
+        if self.details is not None:
+            size += len(self.details.thoughts)
+        return size + sum(len(str(event["data"])) for event in self.events)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Record an event and push it to every subscriber of the task"""
+        event = {"id": len(self.events) + 1, "event": event_type, "data": data}
+        self.events.append(event)
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    def broadcast(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Push a transient event to the current subscribers only, it is neither recorded nor replayed"""
+        event = {"id": len(self.events), "event": event_type, "data": data}
+        for queue in self.subscribers:
+            queue.put_nowait(event)
+
+    def to_response_payload(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "details": (
+                None
+                if self.details is None or self.details.mode is None
+                else {
+                    "mode": self.details.mode,
+                    "thoughts": self.details.thoughts,
+                    "thoughts_data": self.details.thoughts_data,
+                }
+            ),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "trace_id": self.trace_id,
+            "thread_id": self.thread_id,
+            "queue_wait_seconds": ((self.started_at or datetime.now(timezone.utc)) - self.created_at).total_seconds(),
+        }
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.api.services.task_records import TERMINAL_STATUSES, TaskRecord
+from src.config.tasks import task_settings
+
+
+class InMemoryTaskStore:
+    """
+    Keeps task records in the process that runs them.
+
+    Records are mutated in place by their single writer; `changed` only tracks retention. Finished
+    tasks are kept for `ttl_seconds`, and at most `max_finished` of them are retained.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = task_settings.TASK_TTL_SECONDS,
+        max_finished: int = task_settings.TASK_MAX_FINISHED,
+    ) -> None:
+        self._tasks: Dict[str, TaskRecord] = {}
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        self._ttl_seconds = ttl_seconds
+        self._max_finished = max_finished
+        self._evicted = 0
+
+    async def add(self, record: TaskRecord) -> None:
+        self._evict()
+        self._tasks[record.task_id] = record
+
+    def record(self, task_id: str) -> TaskRecord:
+        """The record of a task run by this process, for its writer"""
+        return self._tasks[task_id]
+
+    async def changed(self, record: TaskRecord) -> None:
+        """Called by the writer after every update of `record`"""
+        if record.status in TERMINAL_STATUSES and record.task_id not in self._finished:
+            self._finished[record.task_id] = time.monotonic()
+            self._evict()
+
+    async def get_payload(self, task_id: str) -> Dict[str, Any]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task.to_response_payload()
+
+    async def subscribe(self, task_id: str, last_event_id: int = 0) -> Tuple[List[Dict[str, Any]], asyncio.Queue]:
+        task = self._tasks.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        task.subscribers.append(queue)
+        return task.events[last_event_id:], queue
+
+    async def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        task = self._tasks.get(task_id)
+        if task is not None and queue in task.subscribers:
+            task.subscribers.remove(queue)
+
+    async def close(self) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Retention and memory metrics of the task records"""
+        by_status: Dict[str, int] = {}
+        for task in self._tasks.values():
+            by_status[task.status] = by_status.get(task.status, 0) + 1
+        return {
+            "backend": "memory",
+            "tasks_retained": len(self._tasks),
+            "tasks_by_status": by_status,
+            "tasks_evicted": self._evicted,
+            "events_retained": sum(len(task.events) for task in self._tasks.values()),
+            "subscribers": sum(len(task.subscribers) for task in self._tasks.values()),
+            "approx_bytes": sum(task.approx_size() for task in self._tasks.values()),
+        }
+
+    def _evict(self) -> None:
+        """Drop finished tasks that outlived the TTL or exceed the retention limit, oldest first"""
+        now = time.monotonic()
+        while self._finished:
+            task_id, finished_at = next(iter(self._finished.items()))
+            if len(self._finished) <= self._max_finished and now - finished_at < self._ttl_seconds:
+                break
+            self._finished.popitem(last=False)
+            self._tasks.pop(task_id, None)
+            self._evicted += 1
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+class SQLiteTaskStore(InMemoryTaskStore):
+    """
+    Shares task records between processes on one host through a SQLite file.
+
+    The process running a task keeps its record in memory, like `InMemoryTaskStore`, and writes it
+    behind: updates are flushed in one transaction every TASK_STORE_FLUSH_INTERVAL seconds, terminal
+    updates immediately. Other processes read payloads and events from the file, and a single
+    poller per process forwards new events of the tasks it has subscribers for.
+    """
+
+    _CLEANUP_EVERY = 100
+
+    def __init__(
+        self,
+        path: Path = task_settings.TASK_STORE_PATH,
+        flush_interval: float = task_settings.TASK_STORE_FLUSH_INTERVAL,
+        poll_interval: float = task_settings.TASK_STORE_POLL_INTERVAL,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._path = path
+        self._flush_interval = flush_interval
+        self._poll_interval = poll_interval
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._dirty: Set[str] = set()
+        self._flushed_events: Dict[str, int] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._flushes = 0
+        self._remote: Dict[str, Dict[asyncio.Queue, int]] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    async def add(self, record: TaskRecord) -> None:
+        await super().add(record)
+        self._dirty.add(record.task_id)
+        await self._flush()
+
+    async def changed(self, record: TaskRecord) -> None:
+        self._dirty.add(record.task_id)
+        if record.status in TERMINAL_STATUSES:
+            await self._flush()
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+        await super().changed(record)
+
+    async def get_payload(self, task_id: str) -> Dict[str, Any]:
+        if task_id in self._tasks:
+            return await super().get_payload(task_id)
+        row = await asyncio.to_thread(self._fetch_one, "SELECT payload FROM tasks WHERE task_id = ?", (task_id,))
+        if row is None:
+            raise KeyError(task_id)
+        return json.loads(row[0])
+
+    async def subscribe(self, task_id: str, last_event_id: int = 0) -> Tuple[List[Dict[str, Any]], asyncio.Queue]:
+        if task_id in self._tasks:
+            return await super().subscribe(task_id, last_event_id)
+
+        if await asyncio.to_thread(self._fetch_one, "SELECT 1 FROM tasks WHERE task_id = ?", (task_id,)) is None:
+            raise KeyError(task_id)
+        backlog = await asyncio.to_thread(self._fetch_events, task_id, last_event_id)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._remote.setdefault(task_id, {})[queue] = backlog[-1]["id"] if backlog else last_event_id
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        return backlog, queue
+
+    async def unsubscribe(self, task_id: str, queue: asyncio.Queue) -> None:
+        queues = self._remote.get(task_id)
+        if queues is None:
+            await super().unsubscribe(task_id, queue)
+            return
+        queues.pop(queue, None)
+        if not queues:
+            del self._remote[task_id]
+
+    async def close(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+        await self._flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "backend": "sqlite",
+            "dirty_tasks": len(self._dirty),
+            "flushes": self._flushes,
+            "remote_subscribers": sum(len(queues) for queues in self._remote.values()),
+        }
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._flush_interval)
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            await self._flush_dirty()
+
+    async def _flush_dirty(self) -> None:
+        if not self._dirty:
+            return
+        rows = []
+        events = []
+        for task_id in self._dirty:
+            task = self._tasks.get(task_id)
+            if task is None:
+                continue
+            finished_at = time.time() if task.status in TERMINAL_STATUSES else None
+            rows.append((task_id, task.status, _dumps(task.to_response_payload()), finished_at))
+            flushed = self._flushed_events.get(task_id, 0)
+            events.extend(
+                (task_id, event["id"], event["event"], _dumps(event["data"])) for event in task.events[flushed:]
+            )
+            self._flushed_events[task_id] = len(task.events)
+            if finished_at is not None:
+                self._flushed_events.pop(task_id)
+        self._dirty.clear()
+        await asyncio.to_thread(self._write, rows, events)
+
+    async def _poll(self) -> None:
+        while self._remote:
+            await asyncio.sleep(self._poll_interval)
+            watched = {task_id: min(queues.values()) for task_id, queues in self._remote.items()}
+            new_events = await asyncio.to_thread(self._fetch_new_events, watched)
+            for task_id, task_events in new_events.items():
+                for queue, last_id in self._remote.get(task_id, {}).items():
+                    for event in task_events:
+                        if event["id"] > last_id:
+                            queue.put_nowait(event)
+                    self._remote[task_id][queue] = max(last_id, task_events[-1]["id"])
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False, timeout=5.0)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS tasks "
+                "(task_id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, finished_at REAL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS events "
+                "(task_id TEXT NOT NULL, id INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (task_id, id))"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS tasks_finished_at ON tasks (finished_at)")
+            self._connection.commit()
+        return self._connection
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[tuple]:
+        with self._db_lock:
+            return self._db().execute(query, params).fetchone()
+
+    def _fetch_events(self, task_id: str, after_id: int) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            rows = (
+                self._db()
+                .execute(
+                    "SELECT id, event, data FROM events WHERE task_id = ? AND id > ? ORDER BY id", (task_id, after_id)
+                )
+                .fetchall()
+            )
+        return [{"id": row[0], "event": row[1], "data": json.loads(row[2])} for row in rows]
+
+    def _fetch_new_events(self, watched: Dict[str, int]) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            task_id: events
+            for task_id, after_id in watched.items()
+            if (events := self._fetch_events(task_id, after_id))
+        }
+
+    def _write(self, rows: List[tuple], events: List[tuple]) -> None:
+        with self._db_lock:
+            db = self._db()
+            db.executemany(
+                "INSERT INTO tasks (task_id, status, payload, finished_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (task_id) DO UPDATE SET status = excluded.status, payload = excluded.payload, "
+                "finished_at = excluded.finished_at",
+                rows,
+            )
+            db.executemany("INSERT OR IGNORE INTO events (task_id, id, event, data) VALUES (?, ?, ?, ?)", events)
+            self._flushes += 1
+            if self._flushes % self._CLEANUP_EVERY == 0:
+                self._cleanup(db)
+            db.commit()
+
+    def _cleanup(self, db: sqlite3.Connection) -> None:
+        expired = time.time() - self._ttl_seconds
+        db.execute(
+            "DELETE FROM tasks WHERE finished_at IS NOT NULL AND (finished_at < ? OR task_id IN "
+            "(SELECT task_id FROM tasks WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT -1 OFFSET ?))",
+            (expired, self._max_finished),
+        )
+        db.execute("DELETE FROM events WHERE task_id NOT IN (SELECT task_id FROM tasks)")
+
+
+def create_task_store() -> InMemoryTaskStore:
+    if task_settings.TASK_STORE == "sqlite":
+        return SQLiteTaskStore()
+    return InMemoryTaskStore()
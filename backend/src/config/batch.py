@@ -0,0 +1,9 @@
+from pydantic_settings import BaseSettings
+
+
+class BatchSettings(BaseSettings):
+    BATCH_CONCURRENCY: int = 8
+    BATCH_MAX_ITEMS: int = 1_000
+
+
+batch_settings = BatchSettings()
@@ -0,0 +1,29 @@
+from pathlib import Path
+from typing import Dict
+
+from pydantic_settings import BaseSettings
+
+
+class CacheSettings(BaseSettings):
+    CACHE_ENABLED: bool = True
+    CACHE_PATH: Path = Path(__file__).resolve().parents[2] / "data" / "processed" / "search_cache.sqlite3"
+    CACHE_MEMORY_ITEMS: int = 512
+    CACHE_DISK_MAX_ITEMS: int = 50_000
+    SEARCH_CACHE_TTL: int = 6 * 60 * 60
+    EXTRACT_CACHE_TTL: int = 24 * 60 * 60
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: Path = Path(__file__).resolve().parents[2] / "data" / "processed" / "llm_cache.sqlite3"
+    LLM_CACHE_MEMORY_ITEMS: int = 1_024
+    LLM_CACHE_DISK_MAX_ITEMS: int = 100_000
+    # Seconds a structured response is reused, by output schema; 0 turns caching off for the schema
+    LLM_CACHE_TTL: Dict[str, int] = {
+        "Route": 24 * 60 * 60,
+        "QuestionBreakdown": 24 * 60 * 60,
+        "ResolvedQuestion": 24 * 60 * 60,
+        "ForeignQuestion": 7 * 24 * 60 * 60,
+        "Facts": 24 * 60 * 60,
+        "Validate": 60 * 60,
+    }
+
+
+cache_settings = CacheSettings()
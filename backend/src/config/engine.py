@@ -0,0 +1,20 @@
+from pathlib import Path
+from typing import Literal
+
+from pydantic_settings import BaseSettings
+
+from src.config.tasks import task_settings
+
+
+class EngineSettings(BaseSettings):
+    MAX_VALIDATION_ATTEMPTS: int = 3
+    CHECKPOINTER: Literal["sqlite", "memory", "none"] = "sqlite"
+    CHECKPOINT_PATH: Path = Path(__file__).resolve().parents[2] / "data" / "processed" / "checkpoints.sqlite3"
+    CHECKPOINT_KEEP_FINISHED: bool = False
+    # Threads not run for this long are deleted, finished or not; by default as long as their task is kept
+    CHECKPOINT_TTL_SECONDS: int = task_settings.TASK_TTL_SECONDS
+    RUN_MAX_RESUMES: int = 2
+    RUN_RESUME_BACKOFF: float = 1.0
+
+
+engine_settings = EngineSettings()
@@ -0,0 +1,15 @@
+from pydantic_settings import BaseSettings
+
+
+class HttpSettings(BaseSettings):
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 10.0
+    HTTP_TIMEOUT: float = 120.0
+    HTTP2: bool = False
+    HTTP_WARMUP_CONNECTIONS: int = 2
+    HTTP_WARMUP_TIMEOUT: float = 5.0
+
+
+http_settings = HttpSettings()
@@ -0,0 +1,17 @@
+from pydantic_settings import BaseSettings
+
+
+class LimitSettings(BaseSettings):
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200_000
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_COMPLETION_TOKENS: int = 1_000
+    TAVILY_REQUESTS_PER_MINUTE: int = 100
+    TAVILY_MAX_CONCURRENCY: int = 8
+    RETRY_ATTEMPTS: int = 4
+    RETRY_BASE_DELAY: float = 1.0
+    RETRY_MAX_DELAY: float = 30.0
+    CALL_COALESCING: bool = True
+
+
+limit_settings = LimitSettings()
@@ -5,6 +5,20 @@ class SearchSettings(BaseSettings):
     MAX_RESULTS: int = 5
     SEARCH_THRESHOLD: float = 0.5
     MAX_LEN: int = 399
+    FACTS_CONCURRENCY: int = 5
+    EXTRACT_BATCH_SIZE: int = 20
+    EXTRACT_BATCH_WAIT: float = 0.05
+    MAX_PAGES: int = 12
+    RETRY_MAX_PAGES: int = 4
+    MIN_PAGES_PER_QUERY: int = 1
+    TOKEN_BUDGET: int = 40_000
+    PAGE_TOKEN_BUDGET: int = 3_000
+    FACTS_CALL_TOKENS: int = 8_000
+    PASSAGE_TOKENS: int = 200
+    DEDUP_SIMILARITY: float = 0.9
+    DEDUP_MIN_WORDS: int = 8
+    DOMAIN_PENALTY: float = 0.15
+    TITLE_PENALTY: float = 0.3
 
 
 search_settings = SearchSettings()
@@ -1,4 +1,4 @@
-import sys
+from functools import lru_cache
 from pathlib import Path
 
 from pydantic import model_validator
@@ -35,7 +35,10 @@ class LLMSettings(BaseSettings):
         return self
 
 
-try:
-    LLM_SETTINGS = LLMSettings()
-except ValueError as error:
-    sys.exit(f"Missing .env configuration! \n{error}")
+@lru_cache(maxsize=None)
+def get_llm_settings() -> LLMSettings:
+    """Reads the .env configuration on first use, so importing the app does not require it."""
+    try:
+        return LLMSettings()
+    except ValueError as error:
+        raise RuntimeError(f"Missing .env configuration! \n{error}") from error
@@ -0,0 +1,8 @@
+from pydantic_settings import BaseSettings
+
+
+class StartupSettings(BaseSettings):
+    STARTUP_WARMUP: bool = True
+
+
+startup_settings = StartupSettings()
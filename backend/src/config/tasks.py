@@ -0,0 +1,21 @@
+from pathlib import Path
+from typing import Dict, Literal
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class TaskSettings(BaseSettings):
+    TASK_TTL_SECONDS: int = 60 * 60
+    TASK_MAX_FINISHED: int = 10_000
+    TASK_STORE: Literal["memory", "sqlite"] = "memory"
+    TASK_STORE_PATH: Path = Path(__file__).resolve().parents[2] / "data" / "processed" / "tasks.sqlite3"
+    TASK_STORE_FLUSH_INTERVAL: float = 0.2
+    TASK_STORE_POLL_INTERVAL: float = 0.25
+    TASK_WORKERS: int = Field(default=8, ge=1)
+    TASK_QUEUE_MAX: int = 100
+    TASK_PRIORITY_WEIGHTS: Dict[str, int] = {"simple": 3, "auto": 2, "pro": 1}
+    TASK_COALESCING: bool = True
+
+
+task_settings = TaskSettings()
@@ -0,0 +1,15 @@
+from pathlib import Path
+
+from pydantic_settings import BaseSettings
+
+
+class TracingSettings(BaseSettings):
+    TRACE_ENABLED: bool = True
+    TRACE_SAMPLE_RATE: float = 0.1
+    TRACE_PATH: Path = Path(__file__).resolve().parents[2] / "data" / "processed" / "traces.jsonl"
+    TRACE_QUEUE_MAX: int = 10_000
+    TRACE_BATCH_SIZE: int = 512
+    TRACE_SERVICE_NAME: str = "researcher-backend"
+
+
+tracing_settings = TracingSettings()
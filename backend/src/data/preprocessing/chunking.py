@@ -0,0 +1,136 @@
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+
+from src.config.search import search_settings
+from src.searches.selection import estimate_tokens
+
+if TYPE_CHECKING:
+    from src.data.preprocessing.dedup import NearDuplicateFilter
+
+_WORD = re.compile(r"\w+")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class RankedText:
+    """Page text reduced to its most relevant passages.
+
+    Attributes:
+        text: selected passages joined in their original order
+        tokens_kept: estimated tokens of `text`
+        tokens_dropped: estimated tokens of the passages left out
+        passages_duplicate: passages skipped as near-duplicates of already selected ones
+    """
+
+    text: str
+    tokens_kept: int
+    tokens_dropped: int
+    passages_duplicate: int = 0
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def split_passages(text: str, passage_tokens: int = None) -> List[str]:
+    """
+    Splits text into passages of roughly `passage_tokens` tokens.
+
+    Paragraphs are merged until the size is reached, paragraphs longer than it are cut by words.
+    """
+    passage_tokens = passage_tokens or search_settings.PASSAGE_TOKENS
+    passages: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for paragraph in _PARAGRAPH.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        tokens = estimate_tokens(paragraph)
+        if tokens > passage_tokens:
+            if current:
+                passages.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            words = paragraph.split()
+            step = max(len(words) * passage_tokens // max(tokens, 1), 1)
+            passages.extend(" ".join(words[i : i + step]) for i in range(0, len(words), step))
+            continue
+        if current and current_tokens + tokens > passage_tokens:
+            passages.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+def bm25_scores(passages: List[str], query: str, k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Scores every passage against the query with Okapi BM25, using the passages themselves as the corpus."""
+    query_terms = sorted(set(tokenize(query)))
+    if not passages or not query_terms:
+        return np.zeros(len(passages))
+
+    term_index = {term: i for i, term in enumerate(query_terms)}
+    tf = np.zeros((len(passages), len(query_terms)))
+    lengths = np.zeros(len(passages))
+    for row, passage in enumerate(passages):
+        tokens = tokenize(passage)
+        lengths[row] = len(tokens)
+        columns = [term_index[token] for token in tokens if token in term_index]
+        np.add.at(tf[row], columns, 1)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((len(passages) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / max(lengths.mean(), 1.0))
+    return (tf * (k1 + 1) / (tf + norm[:, None])) @ idf
+
+
+def select_passages(text: str, query: str, token_budget: int, dedup: "NearDuplicateFilter" = None) -> RankedText:
+    """
+    Keeps the passages of `text` that score best against `query` within `token_budget`.
+
+    Args:
+        text: page text.
+        query: text the passages are ranked against.
+        token_budget: estimated token limit of the result.
+        dedup: optional filter shared across pages; passages near-identical to ones it has already
+            seen are skipped, and the selected passages are remembered in it.
+
+    Returns:
+        The selected passages in their original order with kept, dropped and duplicate counters.
+    """
+    passages = split_passages(text)
+    fingerprints = [None] * len(passages)
+    duplicates = 0
+    if dedup is not None:
+        fingerprints = [dedup.fingerprint(passage) for passage in passages]
+        unique = [i for i, fingerprint in enumerate(fingerprints) if not dedup.seen(fingerprint)]
+        duplicates = len(passages) - len(unique)
+        passages = [passages[i] for i in unique]
+        fingerprints = [fingerprints[i] for i in unique]
+
+    sizes = np.array([estimate_tokens(passage) for passage in passages], dtype=int)
+    total = int(sizes.sum())
+    if total <= token_budget:
+        chosen = np.arange(len(passages))
+    else:
+        # Greedy by score: a passage that does not fit is skipped, smaller ones after it may still fit
+        order = np.argsort(-bm25_scores(passages, query), kind="stable")
+        picked, used = [], 0
+        for i in order:
+            if used + sizes[i] <= token_budget:
+                picked.append(i)
+                used += int(sizes[i])
+        chosen = np.sort(np.array(picked, dtype=int))
+
+    if dedup is not None:
+        for i in chosen:
+            dedup.remember(fingerprints[i])
+    kept = int(sizes[chosen].sum())
+    return RankedText("\n\n".join(passages[i] for i in chosen), kept, total - kept, duplicates)
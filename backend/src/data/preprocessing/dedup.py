@@ -0,0 +1,73 @@
+from hashlib import blake2b
+from typing import Optional
+
+import numpy as np
+
+from src.config.search import search_settings
+from src.data.preprocessing.chunking import tokenize
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = tokenize(text)
+    shingles = {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))}
+    return np.fromiter(
+        (int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little") for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the word 3-shingles of `text`."""
+    hashes = _shingle_hashes(text)
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int(np.packbits(votes > 0, bitorder="little").view(np.uint64)[0])
+
+
+class NearDuplicateFilter:
+    """
+    Remembers SimHash fingerprints of the texts it has seen and flags near-copies of them.
+
+    Two texts are near-duplicates when the share of equal fingerprint bits reaches `similarity`
+    (DEDUP_SIMILARITY by default). Texts shorter than DEDUP_MIN_WORDS words are never flagged.
+    """
+
+    def __init__(self, similarity: float = None) -> None:
+        similarity = search_settings.DEDUP_SIMILARITY if similarity is None else similarity
+        self._max_distance = int((1 - similarity) * FINGERPRINT_BITS)
+        self._fingerprints = np.zeros(16, dtype=np.uint64)
+        self._size = 0
+        self.duplicates = 0
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        """SimHash of `text`, None when it is too short to compare."""
+        if len(text.split()) < search_settings.DEDUP_MIN_WORDS:
+            return None
+        return simhash(text)
+
+    def seen(self, fingerprint: Optional[int]) -> bool:
+        if fingerprint is None or not self._size:
+            return False
+        distances = np.bitwise_count(self._fingerprints[: self._size] ^ np.uint64(fingerprint))
+        return bool(distances.min() <= self._max_distance)
+
+    def remember(self, fingerprint: Optional[int]) -> None:
+        if fingerprint is None:
+            return
+        if self._size == len(self._fingerprints):
+            self._fingerprints = np.concatenate([self._fingerprints, np.zeros_like(self._fingerprints)])
+        self._fingerprints[self._size] = fingerprint
+        self._size += 1
+
+    def is_duplicate(self, text: str) -> bool:
+        """Checks `text` against the seen fingerprints and remembers it when it is new."""
+        fingerprint = self.fingerprint(text)
+        if self.seen(fingerprint):
+            self.duplicates += 1
+            return True
+        self.remember(fingerprint)
+        return False
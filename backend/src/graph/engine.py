@@ -0,0 +1,232 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Set
+
+from src.config.engine import engine_settings
+from src.graph.states.state import State
+
+if TYPE_CHECKING:
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+
+NodeUpdate = Callable[[str, Dict[str, Any], State], Awaitable[None]]
+RunRetry = Callable[[int, BaseException], Awaitable[None]]
+
+# Models stored in the graph state, checkpoints may only deserialize these
+_STATE_TYPES = [
+    ("src.graph.pro_mode.schemas.questions", "SubQuestion"),
+    ("src.graph.pro_mode.schemas.facts", "Facts"),
+    ("src.graph.pro_mode.schemas.facts", "Fact"),
+]
+
+
+class Engine:
+    """
+    Runs the router graph behind every endpoint, checkpointing the state after each node.
+
+    Every run belongs to a thread. While a thread has nodes left to run, e.g. after a failed node or
+    a crashed process, running it again resumes after the last completed node, so finished LLM and
+    search calls are not repeated. Checkpoints go to a SQLite file (CHECKPOINTER=sqlite), stay in
+    memory (memory) or are not kept at all (none, runs cannot resume).
+
+    Threads are deleted once their run finishes (unless CHECKPOINT_KEEP_FINISHED), and any thread
+    not run for CHECKPOINT_TTL_SECONDS is deleted too, so failed and abandoned runs do not pile up.
+    """
+
+    _PURGE_EVERY = 64
+
+    def __init__(self) -> None:
+        self._checkpointer: Optional["BaseCheckpointSaver"] = None
+        self._graph: Optional["CompiledStateGraph"] = None
+        self._connection: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._touched: Dict[str, float] = {}
+        self._running: Set[str] = set()
+        self.runs = 0
+        self.resumes = 0
+        self.expired = 0
+
+    async def graph(self) -> "CompiledStateGraph":
+        """The compiled graph with its checkpointer, opened on first use in the running loop"""
+        # Imported on first use so that importing the API does not load LangChain and LangGraph
+        from src.graph.graph import build_router_graph  # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_running_loop()
+        if self._graph is not None and self._loop is loop:
+            return self._graph
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop, self._graph = asyncio.Lock(), loop, None
+        async with self._lock:
+            if self._graph is None:
+                self._checkpointer = await self._open_checkpointer()
+                self._graph = build_router_graph().compile(checkpointer=self._checkpointer)
+                await self._purge()
+        return self._graph
+
+    async def run(
+        self,
+        thread_id: str,
+        state: Optional[State] = None,
+        on_update: Optional[NodeUpdate] = None,
+        on_retry: Optional[RunRetry] = None,
+    ) -> State:
+        """
+        Runs the graph on a thread to the end and returns the final state.
+
+        A thread with nodes left to run is resumed and `state` is ignored; otherwise a new run starts
+        from `state`. A failed run is resumed up to RUN_MAX_RESUMES times, RUN_RESUME_BACKOFF seconds
+        apart (doubling); after that the error is raised and the checkpoint kept for a later resume.
+
+        Args:
+            thread_id: id of the run's checkpoints, unique per run.
+            state: input of a new run.
+            on_update: awaited after every completed node with its name, its update and the state
+                before the update.
+            on_retry: awaited before a failed run is resumed, with the resume number and the error.
+
+        Returns:
+            The state after the last node.
+        """
+        graph = await self.graph()
+        config = {"configurable": {"thread_id": thread_id}}
+        inputs = None if await self.resumable(thread_id) else state
+        self.runs += 1
+        if self.runs % self._PURGE_EVERY == 0:
+            await self._purge()
+        self._running.add(thread_id)
+        resumes = 0
+        try:
+            while True:
+                await self._touch(thread_id)
+                try:
+                    final = await self._stream(graph, config, inputs, on_update)
+                    break
+                except Exception as exc:  # pylint: disable=broad-except
+                    if self._checkpointer is None or resumes >= engine_settings.RUN_MAX_RESUMES:
+                        raise
+                    resumes += 1
+                    self.resumes += 1
+                    print(f"Run {thread_id} failed, resuming from its last checkpoint ({resumes}): {exc!r}")
+                    if on_retry is not None:
+                        await on_retry(resumes, exc)
+                    await asyncio.sleep(engine_settings.RUN_RESUME_BACKOFF * 2 ** (resumes - 1))
+                    inputs = None
+        finally:
+            self._running.discard(thread_id)
+
+        if self._checkpointer is not None and not engine_settings.CHECKPOINT_KEEP_FINISHED:
+            await self._delete(thread_id)
+        return final
+
+    async def resumable(self, thread_id: str) -> bool:
+        """Whether the thread has a checkpoint with nodes left to run"""
+        return bool((await self.checkpoint(thread_id) or {}).get("next"))
+
+    async def checkpoint(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """The state and the next nodes of a thread's last checkpoint, None when there is none"""
+        graph = await self.graph()
+        if self._checkpointer is None:
+            return None
+        snapshot = await graph.aget_state({"configurable": {"thread_id": thread_id}})
+        if not snapshot.values and not snapshot.next:
+            return None
+        return {"values": snapshot.values, "next": list(snapshot.next)}
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+        self._connection = self._checkpointer = self._graph = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checkpointer": engine_settings.CHECKPOINTER,
+            "runs": self.runs,
+            "resumes": self.resumes,
+            "expired": self.expired,
+        }
+
+    async def _stream(
+        self,
+        graph: "CompiledStateGraph",
+        config: Dict[str, Any],
+        inputs: Optional[State],
+        on_update: Optional[NodeUpdate],
+    ) -> State:
+        state: State = dict(inputs or {})
+        async for mode, data in graph.astream(inputs, config, stream_mode=["values", "updates"]):
+            if mode == "values":
+                state = data
+                continue
+            for node, update in data.items():
+                if on_update is not None and isinstance(update, dict):
+                    await on_update(node, update, state)
+        return state
+
+    async def _touch(self, thread_id: str) -> None:
+        """Records that the thread was run now, its TTL starts over"""
+        if self._checkpointer is None:
+            return
+        if self._connection is None:
+            self._touched[thread_id] = time.time()
+            return
+        await self._connection.execute(
+            "INSERT OR REPLACE INTO engine_threads (thread_id, touched_at) VALUES (?, ?)", (thread_id, time.time())
+        )
+        await self._connection.commit()
+
+    async def _delete(self, thread_id: str) -> None:
+        await self._checkpointer.adelete_thread(thread_id)
+        self._touched.pop(thread_id, None)
+        if self._connection is not None:
+            await self._connection.execute("DELETE FROM engine_threads WHERE thread_id = ?", (thread_id,))
+            await self._connection.commit()
+
+    async def _purge(self) -> None:
+        """Deletes the threads not run for CHECKPOINT_TTL_SECONDS, except those running in this process"""
+        if self._checkpointer is None:
+            return
+        cutoff = time.time() - engine_settings.CHECKPOINT_TTL_SECONDS
+        if self._connection is None:
+            expired = [thread_id for thread_id, touched_at in self._touched.items() if touched_at < cutoff]
+        else:
+            async with self._connection.execute(
+                "SELECT thread_id FROM engine_threads WHERE touched_at < ?", (cutoff,)
+            ) as cursor:
+                expired = [row[0] for row in await cursor.fetchall()]
+        for thread_id in expired:
+            if thread_id not in self._running:
+                await self._delete(thread_id)
+                self.expired += 1
+
+    async def _open_checkpointer(self) -> Optional["BaseCheckpointSaver"]:
+        # pylint: disable=import-outside-toplevel
+        from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+        serde = JsonPlusSerializer(allowed_msgpack_modules=_STATE_TYPES)
+        if engine_settings.CHECKPOINTER == "memory":
+            from langgraph.checkpoint.memory import InMemorySaver
+
+            return InMemorySaver(serde=serde)
+        if engine_settings.CHECKPOINTER == "sqlite":
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+            engine_settings.CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = await aiosqlite.connect(engine_settings.CHECKPOINT_PATH)
+            await self._connection.execute("PRAGMA journal_mode=WAL")
+            await self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS engine_threads (thread_id TEXT PRIMARY KEY, touched_at REAL NOT NULL)"
+            )
+            saver = AsyncSqliteSaver(self._connection, serde=serde)
+            await saver.setup()
+            # Threads checkpointed without a run time yet start their TTL now
+            await self._connection.execute(
+                "INSERT OR IGNORE INTO engine_threads SELECT DISTINCT thread_id, ? FROM checkpoints", (time.time(),)
+            )
+            await self._connection.commit()
+            return saver
+        return None
+
+
+engine = Engine()
@@ -1,60 +1,66 @@
 from langgraph.graph import END, START, StateGraph
 
+from src.config.engine import engine_settings
 from src.graph.nodes.simple import simple_mode
 from src.graph.pro_mode.aggregator import aggregator
 from src.graph.pro_mode.decomposer import decomposer
-from src.graph.pro_mode.facts_retriever import retrieve_facts
+from src.graph.pro_mode.facts_retriever import retrieve_facts, retrieve_missing_facts
 from src.graph.router.router import llm_call_router, route_decision
 from src.graph.states.state import State
 from src.graph.validator.validator import define_validating_agent, validator_answer
 
 
-def validation_router(state: State):
-    # Check number of attempt in state
-    if not hasattr(state, "validation_attempts"):
-        state["validation_attempts"] = 0
+def validation_router(state: State) -> str:
+    """
+    Ends the run on an accepted answer or after MAX_VALIDATION_ATTEMPTS, otherwise picks the revision.
 
-    result = validator_answer(state)
-    state["validation_attempts"] += 1
-
-    if state["validation_attempts"] >= 3:
+    A rejected pro-mode answer is revised without redoing earlier work: only the information the
+    validator reported as missing is researched before the answer is re-aggregated.
+    """
+    if validator_answer(state) == "yes":
+        return "yes"
+    if state.get("validation_attempts", 0) >= engine_settings.MAX_VALIDATION_ATTEMPTS:
         return "max_attempts_reached"
+    if state["decision"] != "pro":
+        return "retry_simple"
+    if state.get("missing_information"):
+        return "research_missing"
+    return "revise"
 
-    if result == "yes":
-        return "yes"
-    elif result == "no" and state["validation_attempts"] < 3:
-        return "retry"
-
-
-router_builder = StateGraph(State)
-
-
-router_builder.add_node("llm_call_router", llm_call_router)
-router_builder.add_node("simple", simple_mode)
-router_builder.add_node("pro", decomposer)
-router_builder.add_node("retrieve_facts", retrieve_facts)
-router_builder.add_node("validator", define_validating_agent)
-router_builder.add_node("aggregator", aggregator)
-
-router_builder.add_edge(START, "llm_call_router")
-router_builder.add_conditional_edges(
-    "llm_call_router",
-    route_decision,
-    {"pro": "pro", "simple": "simple"},
-)
-router_builder.add_edge("pro", "retrieve_facts")  # "validator")
-router_builder.add_edge("retrieve_facts", "aggregator")  # "validator")
-router_builder.add_edge("aggregator", END)  # "validator")
-router_builder.add_edge("simple", END)  # "validator")
-
-router_builder.add_conditional_edges(
-    "validator",
-    validation_router,
-    {
-        "yes": END,  # End the cycle if user's question was answered
-        "retry": "llm_call_router",  # Go back to router, if MAS' response was unsafficient and max_attempts < 3
-        "max_attempts_reached": END,  # End if max_attempts > 3
-    },
-)
-
-router_workflow = router_builder.compile()
+
+def build_router_graph() -> StateGraph:
+    """The router graph with all its nodes and edges, not compiled yet"""
+    router_builder = StateGraph(State)
+
+    router_builder.add_node("llm_call_router", llm_call_router)
+    router_builder.add_node("simple", simple_mode)
+    router_builder.add_node("pro", decomposer)
+    router_builder.add_node("retrieve_facts", retrieve_facts)
+    router_builder.add_node("retrieve_missing_facts", retrieve_missing_facts)
+    router_builder.add_node("validator", define_validating_agent)
+    router_builder.add_node("aggregator", aggregator)
+
+    router_builder.add_edge(START, "llm_call_router")
+    router_builder.add_conditional_edges(
+        "llm_call_router",
+        route_decision,
+        {"pro": "pro", "simple": "simple"},
+    )
+    router_builder.add_edge("pro", "retrieve_facts")
+    router_builder.add_edge("retrieve_facts", "aggregator")
+    router_builder.add_edge("aggregator", "validator")
+    router_builder.add_edge("simple", "validator")
+    router_builder.add_edge("retrieve_missing_facts", "aggregator")
+
+    router_builder.add_conditional_edges(
+        "validator",
+        validation_router,
+        {
+            "yes": END,  # End the cycle if user's question was answered
+            "retry_simple": "simple",  # Improve the simple-mode answer with the reviewer's feedback
+            "research_missing": "retrieve_missing_facts",  # Research what is missing, then re-aggregate
+            "revise": "aggregator",  # Rewrite the pro-mode answer from the facts already collected
+            "max_attempts_reached": END,  # Keep the last draft
+        },
+    )
+    return router_builder
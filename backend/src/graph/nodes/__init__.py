@@ -0,0 +1,17 @@
+from src.graph.nodes.simple import simple_mode
+from src.graph.pro_mode.aggregator import aggregator
+from src.graph.pro_mode.decomposer import decomposer
+from src.graph.pro_mode.facts_retriever import retrieve_facts, retrieve_missing_facts
+from src.graph.router.router import llm_call_router
+from src.graph.validator.validator import define_validating_agent, validator_answer
+
+__all__ = [
+    "aggregator",
+    "decomposer",
+    "define_validating_agent",
+    "llm_call_router",
+    "retrieve_facts",
+    "retrieve_missing_facts",
+    "simple_mode",
+    "validator_answer",
+]
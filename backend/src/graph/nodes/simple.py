@@ -1,12 +1,36 @@
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
 
 from src.graph.states.state import State
-from src.searches.simple.llm_with_search import llm_with_search
+from src.graph.streaming import emit_token
+from src.observability.metrics import instrumented_node
+from src.searches.simple.llm_with_search import get_llm_with_search
 
 
+@instrumented_node("simple_mode")
 async def simple_mode(state: State):
-    """Handles simple questions using the straightforward knowledge QA system"""
+    """Handles simple questions using the straightforward knowledge QA system, streaming the answer tokens"""
 
-    result = await llm_with_search.ainvoke({"messages": [HumanMessage(content=state["input"])]})
+    messages = [HumanMessage(content=state["input"])]
+    if state.get("validation_feedback") and state.get("output"):
+        messages += [
+            AIMessage(content=state["output"]),
+            HumanMessage(
+                content=f"This answer was rejected by a reviewer: {state['validation_feedback']}\n"
+                "Improve it, searching only for what is still missing."
+            ),
+        ]
+    result = None
+    async for mode, data in get_llm_with_search().astream({"messages": messages}, stream_mode=["messages", "values"]):
+        if mode == "values":
+            result = data
+            continue
+        chunk, metadata = data
+        # Only text of the model turns is the answer, tool calls and tool results are not streamed
+        if (
+            metadata.get("langgraph_node") == "model"
+            and isinstance(chunk, AIMessageChunk)
+            and not chunk.tool_call_chunks
+        ):
+            await emit_token(chunk.text)
 
     return {"output": result["messages"][-1].content}
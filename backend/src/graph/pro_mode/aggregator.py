@@ -1,17 +1,41 @@
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from src.graph.pro_mode.schemas.result import Result
+from src.graph.pro_mode.schemas.facts import Facts
+from src.graph.pro_mode.schemas.questions import SubQuestion
 from src.graph.states.state import State
-from src.models.llm import llm
+from src.graph.streaming import emit_token
+from src.models.llm import get_llm
+from src.observability.metrics import instrumented_node
+from src.observability.tracing import annotate
 
-llm_aggregator = llm.with_structured_output(Result)
 
+def _format_facts(number: int, query: SubQuestion, facts: Facts) -> str:
+    """One subquery with its facts, each marked with the number of the source it was taken from"""
+    if not facts.facts:
+        return f"SUBQUERY {number}: {query.text}\nFACTS: nothing found\n"
+    listed = " | ".join(f"{fact.text} [{fact.source}]" if fact.source else fact.text for fact in facts.facts)
+    sources = " ".join(f"[{source}] {url}" for source, url in enumerate(facts.sources, 1))
+    return f"SUBQUERY {number}: {query.text}\nFACTS: {listed}\nSOURCES: {sources}\n"
 
+
+@instrumented_node("aggregator")
 async def aggregator(state: State):
-    answer = await llm_aggregator.ainvoke(
-        [
-            SystemMessage(
-                content="""You are an expert research analyst tasked with synthesizing information from multiple sources.
+    """Writes the final answer from the collected facts, streaming its tokens as they are generated."""
+    revision = ""
+    if state.get("validation_feedback") and state.get("output"):
+        revision = f"""
+
+        **PREVIOUS DRAFT (rejected by the reviewer):**
+        {state["output"]}
+
+        **REVIEWER FEEDBACK:**
+        {state["validation_feedback"]}
+
+        Fix every issue raised in the feedback and keep what was correct in the draft."""
+
+    messages = [
+        SystemMessage(
+            content="""You are an expert research analyst tasked with synthesizing information from multiple sources.
 
         **YOUR ROLE:**
         - Carefully analyze all collected facts and subquery answers
@@ -20,7 +44,7 @@ async def aggregator(state: State):
         - Maintain factual accuracy and logical coherence
 
         **PROCESSING INSTRUCTIONS:**
-        1. Review each subquery and its corresponding facts
+        1. Review each subquery and its corresponding facts, a fact's [n] refers to the subquery's SOURCES
         2. Synthesize the information to form a complete understanding
         3. Construct a well-structured, comprehensive answer
         4. Ensure all relevant facts are incorporated appropriately
@@ -30,10 +54,11 @@ async def aggregator(state: State):
         - Answer must be based exclusively on the provided facts
         - Include relevant details and contextual information
         - Present information in a logical, easy-to-follow structure
-        - Be thorough yet concise in your final response"""
-            ),
-            HumanMessage(
-                content=f"""**RESEARCH TASK**
+        - Be thorough yet concise in your final response
+        - Reply with the final answer only, as plain text or Markdown"""
+        ),
+        HumanMessage(
+            content=f"""**RESEARCH TASK**
 
         **ORIGINAL QUESTION:**
         {state["input"]}
@@ -43,17 +68,22 @@ async def aggregator(state: State):
 
         **COLLECTED FACTS BY SUBQUERY:**
         {'---'.join([
-                    f"SUBQUERY {i + 1}: {query.text}{chr(10)}FACTS: {' | '.join([fact.text for fact in facts.facts])}"
+                    _format_facts(i + 1, query, facts)
                     for i, (query, facts) in enumerate(zip(state["sub_queries"], state["facts"]))
                 ])}
 
         **YOUR TASK:**
         1. Analyze all subqueries and their corresponding facts
         2. Synthesize this information to answer the original question comprehensively
-        3. Provide a complete, evidence-based final answer"""
-            ),
-        ]
-    )
+        3. Provide a complete, evidence-based final answer{revision}"""
+        ),
+    ]
+
+    chunks = []
+    async for chunk in get_llm().astream(messages):
+        chunks.append(chunk.text)
+        await emit_token(chunk.text)
 
-    print(answer)
-    return {"output": answer.full_answer}
+    answer = "".join(chunks)
+    annotate(answer_chars=len(answer))
+    return {"output": answer}
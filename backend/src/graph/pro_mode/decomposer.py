@@ -1,12 +1,16 @@
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.graph.pro_mode.llm_decomposer import llm_decomposer
+from src.graph.pro_mode.question_graph import question_dependencies
 from src.graph.states.state import State
+from src.observability.metrics import instrumented_node
+from src.observability.tracing import annotate
 
 
+@instrumented_node("decomposer")
 async def decomposer(state: State):
     """Handles complex questions using the pro-mode researcher system"""
-    result = await llm_decomposer.ainvoke(
+    result = await llm_decomposer().ainvoke(
         [
             SystemMessage(
                 content="""Role: You are an expert in logical decomposition and information retrieval.
@@ -16,6 +20,8 @@ Principles for Decomposition:
 1. Identify the Core Goal: Start by understanding the final, specific piece of information the question is asking for.
 2. Work Backwards: Determine the fundamental facts needed to calculate or arrive at that final answer. Treat it like a math word problem or a logic puzzle.
 3. Sequential Dependency: Order the sub-questions so that the answer to one may be needed to understand or find the next. They should form a logical chain.
+   For every sub-question list in `depends_on` the numbers of the earlier sub-questions whose answers it needs (e.g. "Who founded the company from step 1?" depends on 1).
+   Leave `depends_on` empty when a sub-question can be searched on its own: independent sub-questions are researched in parallel.
 4. Atomicity: Each sub-question should target a single, atomic fact. Avoid combining multiple unrelated queries into one.
 5. Neutral Framing: Phrase sub-questions neutrally without presuming the answer. Do not include calculations (e.g., don't write "subtract X from Y").
 6. Maintain Context: Use the same terminology, timeframes, and entities as the original question to preserve context."""
@@ -23,9 +29,11 @@ Principles for Decomposition:
             HumanMessage(content=state["input"]),
         ]
     )
-    print(f"reasoning: {result.reasoning}")
-    print(f"total_subquestions: {result.total_subquestions}")
-    print(f"subquestions: {result.subquestions}")
+    annotate(
+        subquestions=len(result.subquestions),
+        dependent_subquestions=sum(1 for prerequisites in question_dependencies(result.subquestions) if prerequisites),
+        reasoning_chars=len(result.reasoning),
+    )
 
     return {
         "sub_queries": result.subquestions,
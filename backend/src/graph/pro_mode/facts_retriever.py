@@ -1,20 +1,173 @@
+import asyncio
+from collections import Counter
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
 from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.config.search import search_settings
+from src.data.preprocessing.chunking import select_passages
+from src.data.preprocessing.dedup import NearDuplicateFilter
+from src.graph.pro_mode.question_graph import question_dependencies, run_question_graph
 from src.graph.pro_mode.schemas.facts import Facts
 from src.graph.pro_mode.schemas.foreign_question import ForeignQuestion
+from src.graph.pro_mode.schemas.questions import ResolvedQuestion, SubQuestion
 from src.graph.states.state import State
-from src.models.llm import llm
-from src.searches.extractor import fetch_and_extract
-
-llm_for_facts = llm.with_structured_output(Facts)
-foreign_llm = llm.with_structured_output(ForeignQuestion)
+from src.models.llm import structured_llm
+from src.observability.metrics import instrumented_node
+from src.observability.tracing import annotate, span
+from src.searches.extractor import ExtractedPage, PageKey, stream_extract
 
 
+@instrumented_node("retrieve_facts")
 async def retrieve_facts(state: State):
-    questions = [question.text[: search_settings.MAX_LEN] for question in state["sub_queries"]]
+    """
+    Researches the subquestions in dependency order, see `run_question_graph`, collecting one `Facts`
+    per subquestion.
+
+    The independent subquestions are searched together with the translated question in one pipeline.
+    A dependent subquestion is rewritten with the facts found for its prerequisites as soon as they
+    are in, then searched on its own share of the page and token budgets. Facts found through the
+    translated question are listed under it as an extra subquestion.
+    """
+    subquestions = list(state["sub_queries"])
+    questions = [question.text[: search_settings.MAX_LEN] for question in subquestions]
+    dependencies = question_dependencies(subquestions)
+    dependent_count = sum(1 for prerequisites in dependencies if prerequisites)
+    dependent_pages = max(search_settings.MAX_PAGES // max(len(subquestions), 1), 1)
+    semaphore = asyncio.Semaphore(search_settings.FACTS_CONCURRENCY)
+
+    translation = asyncio.create_task(_translate(state["input"]))
+    page_urls: List[str] = []
+    info: Counter = Counter()
+    resolved: Dict[int, str] = {}
+    foreign: List[Tuple[str, Facts]] = []
+
+    async def _answer_roots(roots: List[int]) -> Dict[int, Optional[Facts]]:
+        root_questions = [questions[index] for index in roots]
+
+        def _query_text(index: int) -> str:
+            if index < len(root_questions):
+                return root_questions[index]
+            return _translated(translation) or state["input"]
+
+        def _page_query(page: ExtractedPage) -> str:
+            return "\n".join([state["input"], *(_query_text(index) for index in page.query_indices)])
+
+        max_pages = max(search_settings.MAX_PAGES - dependent_pages * dependent_count, len(roots))
+        extract_stats: Dict[str, int] = {}
+        pages = _remember_urls(
+            stream_extract(
+                root_questions, foreign_query=_foreign_search(translation), stats=extract_stats, max_pages=max_pages
+            ),
+            page_urls,
+        )
+        query_facts, facts_info = await _extract_facts_by_query(
+            state["input"],
+            pages,
+            _query_text,
+            _page_query,
+            token_budget=_token_share(max_pages),
+            semaphore=semaphore,
+        )
+        info.update(extract_stats)
+        info.update(facts_info)
+        if len(roots) in query_facts:
+            foreign.append((_query_text(len(roots)), query_facts[len(roots)]))
+        return {index: query_facts.get(position) for position, index in enumerate(roots)}
+
+    async def _answer_dependent(index: int, prerequisites: Dict[int, Optional[Facts]]) -> Optional[Facts]:
+        with span("subquestion", number=index + 1, depends_on=len(prerequisites)) as current:
+            question = await _resolve_question(state["input"], questions, index, prerequisites)
+            questions[index] = resolved[index] = question
+            extract_stats: Dict[str, int] = {}
+            pages = _remember_urls(
+                stream_extract([question], stats=extract_stats, max_pages=dependent_pages, exclude_urls=page_urls),
+                page_urls,
+            )
+            query_facts, facts_info = await _extract_facts_by_query(
+                state["input"],
+                pages,
+                lambda _: question,
+                lambda _: f"{state['input']}\n{question}",
+                token_budget=_token_share(dependent_pages),
+                semaphore=semaphore,
+            )
+            info.update(extract_stats)
+            info.update(facts_info)
+            current.set(facts=len(query_facts[0].facts) if 0 in query_facts else 0)
+        return query_facts.get(0)
+
+    try:
+        answers = await run_question_graph(dependencies, _answer_roots, _answer_dependent)
+    finally:
+        translation.cancel()
+
+    sub_queries = [
+        subquestion.model_copy(update={"text": resolved[index]}) if index in resolved else subquestion
+        for index, subquestion in enumerate(subquestions)
+    ]
+    facts = [answers.get(index) or _no_facts() for index in range(len(subquestions))]
+    for text, foreign_facts in foreign:
+        sub_queries.append(SubQuestion(text=text))
+        facts.append(foreign_facts)
+
+    facts_info = dict(info)
+    annotate(
+        facts=sum(len(query_facts.facts) for query_facts in facts),
+        dependent_subquestions=dependent_count,
+        **facts_info,
+    )
+    return {"sub_queries": sub_queries, "facts": facts, "facts_info": facts_info, "page_urls": page_urls}
+
+
+@instrumented_node("retrieve_missing_facts")
+async def retrieve_missing_facts(state: State):
+    """
+    Researches only what the validator reported as missing, on pages no earlier attempt has used.
 
-    foreign_question = await foreign_llm.ainvoke(
+    The new questions and their facts are appended to the ones collected by earlier attempts, at most
+    RETRY_MAX_PAGES pages are read.
+    """
+    questions = [question[: search_settings.MAX_LEN] for question in state.get("missing_information", [])]
+    page_urls = list(state.get("page_urls", []))
+
+    def _page_query(page: ExtractedPage) -> str:
+        return "\n".join([state["input"], *(questions[index] for index in page.query_indices)])
+
+    extract_stats: Dict[str, int] = {}
+    pages = _remember_urls(
+        stream_extract(
+            questions, stats=extract_stats, max_pages=search_settings.RETRY_MAX_PAGES, exclude_urls=page_urls
+        ),
+        page_urls,
+    )
+    query_facts, facts_info = await _extract_facts_by_query(
+        state["input"], pages, lambda index: questions[index], _page_query
+    )
+    new_facts = [query_facts.get(index) or _no_facts() for index in range(len(questions))]
+    annotate(
+        questions=len(questions), facts=sum(len(facts.facts) for facts in new_facts), **facts_info, **extract_stats
+    )
+    return {
+        "sub_queries": [*state.get("sub_queries", []), *(SubQuestion(text=question) for question in questions)],
+        "facts": [*state.get("facts", []), *new_facts],
+        "facts_info": {**facts_info, **extract_stats},
+        "page_urls": page_urls,
+    }
+
+
+def _no_facts() -> Facts:
+    return Facts(summary="", facts=[])
+
+
+async def _remember_urls(pages: AsyncIterator[ExtractedPage], urls: List[str]) -> AsyncIterator[ExtractedPage]:
+    async for page in pages:
+        urls.append(page.url)
+        yield page
+
+
+async def _translate(query: str) -> ForeignQuestion:
+    return await structured_llm(ForeignQuestion).ainvoke(
         [
             SystemMessage(
                 content="""You are a professional multilingual translator specialized in query localization.
@@ -34,7 +187,7 @@ QUALITY STANDARDS:
             ),
             HumanMessage(
                 content=f"""**QUERY TO TRANSLATE:**
-{state["input"]}
+{query}
 
 TASK:
 1. Identify the original language of this query
@@ -44,47 +197,235 @@ TASK:
         ]
     )
 
+
+def _translated(translation: "asyncio.Task[ForeignQuestion]") -> Optional[str]:
+    if translation.done() and not translation.cancelled() and translation.exception() is None:
+        return translation.result().translated_question
+    return None
+
+
+async def _foreign_search(translation: "asyncio.Task[ForeignQuestion]") -> Optional[Tuple[str, str]]:
+    try:
+        foreign_question = await translation
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Translation failed, skipping foreign search: {exc!r}")
+        return None
+
     country = "united states"
     if foreign_question.language == "eng":
         country = "russia"
-    retrieved_texts = await fetch_and_extract(
-        questions, foreign_query=foreign_question.translated_question, country=country
-    )
-    source_facts = []
-    for text in retrieved_texts:
-        content = "------".join([article["raw_content"] for article in text["results"]])
-        print(f"Content: {content[:100]}...")
-        collected_facts = await llm_for_facts.ainvoke(
+    return foreign_question.translated_question, country
+
+
+async def _resolve_question(
+    question: str, subquestions: List[str], index: int, prerequisites: Dict[int, Optional[Facts]]
+) -> str:
+    """
+    Rewrites a dependent subquestion into a standalone query using the facts found for its prerequisites.
+
+    Falls back to the subquestion as written when nothing was found for them or the call fails.
+    """
+    known = [
+        f"SUBQUESTION {prerequisite + 1}: {subquestions[prerequisite]}\n"
+        f"FACTS: {' | '.join(fact.text for fact in facts.facts)}"
+        for prerequisite, facts in sorted(prerequisites.items())
+        if facts is not None and facts.facts
+    ]
+    if not known:
+        return subquestions[index]
+    try:
+        result = await structured_llm(ResolvedQuestion).ainvoke(
             [
                 SystemMessage(
-                    content="""You are an expert information analyst specialized in fact extraction.
-
-                    **YOUR ROLE:**
-                    - Carefully analyze the provided text and identify ALL relevant facts
-                    - Focus on factual information that helps answer the user's original question
-                    - Extract numerical data, dates, names, relationships, and key statements
-                    - Maintain objectivity and avoid interpretation or opinion
-
-                    **EXTRACTION GUIDELINES:**
-                    1. Extract complete facts with necessary context
-                    2. Include quantitative data (numbers, statistics, measurements)
-                    3. Capture qualitative information (relationships, properties, characteristics)
-                    4. Preserve source credibility by maintaining factual accuracy
-                    5. Focus on information directly relevant to answering the question
-
-                    **OUTPUT:** Provide a comprehensive list of facts that your colleague can use to construct a complete answer."""
+                    content="""You are an expert in information retrieval.
+
+                **YOUR TASK:**
+                Rewrite a subquestion that refers to the answers of earlier subquestions ("the company from step 1",
+                "that year") into a standalone search query.
+
+                **RULES:**
+                1. Replace every such reference with the concrete entity, date or value established by the facts
+                2. Keep the intent, terminology and timeframe of the subquestion
+                3. Do not answer the subquestion itself
+                4. If the facts do not settle a reference, keep its wording from the subquestion"""
                 ),
                 HumanMessage(
-                    content=f"""**ORIGINAL QUESTION:** {state['input']}
+                    content=f"""**ORIGINAL QUESTION:** {question}
 
-                    **TEXT TO ANALYZE:**
-                    {content}
+                **ANSWERED SUBQUESTIONS:**
+                {'---'.join(known)}
 
-                    **TASK:** Extract all relevant facts from the text above that help answer the original question."""
+                **SUBQUESTION {index + 1} TO REWRITE:** {subquestions[index]}"""
                 ),
             ]
         )
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Resolving subquestion {index + 1} failed, searching it as written: {exc!r}")
+        return subquestions[index]
+    return result.text.strip()[: search_settings.MAX_LEN] or subquestions[index]
+
+
+def _token_share(max_pages: int) -> int:
+    """The part of TOKEN_BUDGET that goes with `max_pages` of the MAX_PAGES page budget"""
+    return search_settings.TOKEN_BUDGET * min(max_pages, search_settings.MAX_PAGES) // max(search_settings.MAX_PAGES, 1)
+
+
+async def _extract_facts(question: str, subquestion: str, sources: List[Tuple[str, str]]) -> Facts:
+    facts = await structured_llm(Facts).ainvoke(
+        [
+            SystemMessage(
+                content="""You are an expert information analyst specialized in fact extraction.
+
+                **YOUR ROLE:**
+                - Carefully analyze the provided sources and identify ALL relevant facts
+                - Focus on factual information that helps answer the subquestion and the user's original question
+                - Extract numerical data, dates, names, relationships, and key statements
+                - Maintain objectivity and avoid interpretation or opinion
+
+                **EXTRACTION GUIDELINES:**
+                1. Extract complete facts with necessary context
+                2. Include quantitative data (numbers, statistics, measurements)
+                3. Capture qualitative information (relationships, properties, characteristics)
+                4. Preserve source credibility by maintaining factual accuracy
+                5. Focus on information directly relevant to answering the question
+                6. Give the number of the SOURCE block every fact was taken from
+
+                **OUTPUT:** Provide a comprehensive list of facts that your colleague can use to construct a complete answer."""
+            ),
+            HumanMessage(
+                content=f"""**ORIGINAL QUESTION:** {question}
+
+                **SUBQUESTION:** {subquestion}
+
+                **SOURCES TO ANALYZE:**
+                {chr(10).join(f"SOURCE [{number}] {url}:{chr(10)}{text}{chr(10)}" for number, (url, text) in enumerate(sources, 1))}
+
+                **TASK:** Extract all relevant facts from the sources above that help answer the subquestion."""
+            ),
+        ]
+    )
+    facts.sources = [url for url, _ in sources]
+    for fact in facts.facts:
+        if not 1 <= fact.source <= len(facts.sources):
+            fact.source = 0
+    return facts
+
+
+def _merge_facts(parts: List[Facts]) -> Facts:
+    """Joins the facts extracted for one query by several calls, renumbering their sources"""
+    if len(parts) == 1:
+        return parts[0]
+    merged = Facts(summary=" ".join(part.summary for part in parts if part.summary), facts=[])
+    for part in parts:
+        offset = len(merged.sources)
+        merged.facts.extend(
+            fact.model_copy(update={"source": fact.source + offset}) if fact.source else fact for fact in part.facts
+        )
+        merged.sources.extend(part.sources)
+    return merged
+
+
+async def _extract_facts_by_query(
+    question: str,
+    pages: AsyncIterator[ExtractedPage],
+    query_text: Callable[[int], str],
+    page_query: Callable[[ExtractedPage], str],
+    token_budget: Optional[int] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Tuple[Dict[int, Facts], Dict[str, int]]:
+    """
+    Extracts the facts for every query from the pages it owns, in a few merged calls per query.
+
+    A page is owned by the first query whose results contained it. Pages and passages that are
+    near-duplicates of ones already sent are skipped. Each page is reduced to its passages that rank
+    best against `page_query(page)`, within PAGE_TOKEN_BUDGET per page and `token_budget` for the
+    whole stream; pages arriving after that budget is spent are skipped. A query's passages are sent
+    in one call as soon as they reach FACTS_CALL_TOKENS and the rest once the stream ends, with at
+    most FACTS_CONCURRENCY calls in flight.
+
+    Args:
+        question: the user's original question.
+        pages: unique extracted pages, see `stream_extract`.
+        query_text: text of a query by index, the facts are extracted for it.
+        page_query: builds the text a page's passages are ranked against.
+        token_budget: tokens sent for all pages, TOKEN_BUDGET by default.
+        semaphore: limits the calls in flight, shared by streams of the same request.
+
+    Returns:
+        Merged facts of every query with a successful call, and page, call and token counters.
+    """
+    semaphore = semaphore or asyncio.Semaphore(search_settings.FACTS_CONCURRENCY)
+
+    async def _bounded(index: int, sources: List[Tuple[str, str]]) -> Facts:
+        async with semaphore:
+            return await _extract_facts(question, query_text(index), sources)
+
+    info = {
+        "pages_total": 0,
+        "pages_succeeded": 0,
+        "pages_over_budget": 0,
+        "pages_duplicate": 0,
+        "passages_duplicate": 0,
+        "tokens_sent": 0,
+        "tokens_dropped": 0,
+        "facts_calls": 0,
+    }
+    tokens_left = search_settings.TOKEN_BUDGET if token_budget is None else token_budget
+    page_dedup = NearDuplicateFilter()
+    passage_dedup = NearDuplicateFilter()
+    pending: Dict[int, List[Tuple[PageKey, str, str]]] = {}
+    pending_tokens: Counter = Counter()
+    calls: Dict[int, List[Tuple[int, asyncio.Task]]] = {}
+
+    def _send(index: int) -> None:
+        # Sources in page order, so the same pages always make the same prompt
+        sources = sorted(pending.pop(index))
+        pending_tokens.pop(index, None)
+        info["facts_calls"] += 1
+        task = asyncio.create_task(_bounded(index, [(url, text) for _, url, text in sources]))
+        calls.setdefault(index, []).append((len(sources), task))
+
+    async for page in pages:
+        if page_dedup.is_duplicate(page.raw_content):
+            info["pages_duplicate"] += 1
+            continue
+        if tokens_left <= 0:
+            info["pages_over_budget"] += 1
+            continue
+        ranked = select_passages(
+            page.raw_content,
+            page_query(page),
+            min(search_settings.PAGE_TOKEN_BUDGET, tokens_left),
+            dedup=passage_dedup,
+        )
+        info["passages_duplicate"] += ranked.passages_duplicate
+        if not ranked.text:
+            # Passages were left but none fit the budget, otherwise all of them were duplicates
+            info["pages_over_budget" if ranked.tokens_dropped else "pages_duplicate"] += 1
+            continue
+        tokens_left -= ranked.tokens_kept
+        info["tokens_sent"] += ranked.tokens_kept
+        info["tokens_dropped"] += ranked.tokens_dropped
+        info["pages_total"] += 1
+
+        owner = page.query_indices[0]
+        pending.setdefault(owner, []).append((page.key, page.url, ranked.text))
+        pending_tokens[owner] += ranked.tokens_kept
+        if pending_tokens[owner] >= search_settings.FACTS_CALL_TOKENS:
+            _send(owner)
+    for owner in sorted(pending):
+        _send(owner)
 
-        source_facts.append(collected_facts)
-    print(f"Collected Facts: {source_facts}")
-    return {"facts": source_facts}
+    query_facts = {}
+    for index in sorted(calls):
+        results = await asyncio.gather(*(task for _, task in calls[index]), return_exceptions=True)
+        parts = []
+        for (page_count, _), result in zip(calls[index], results):
+            if isinstance(result, Exception):
+                print(f"Fact extraction failed: {result!r}")
+                continue
+            info["pages_succeeded"] += page_count
+            parts.append(result)
+        if parts:
+            query_facts[index] = _merge_facts(parts)
+    return query_facts, info
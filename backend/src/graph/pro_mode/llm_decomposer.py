@@ -1,4 +1,8 @@
+from langchain_core.runnables import Runnable
+
 from src.graph.pro_mode.schemas.questions import QuestionBreakdown
-from src.models.llm import llm
+from src.models.llm import structured_llm
+
 
-llm_decomposer = llm.with_structured_output(QuestionBreakdown)
+def llm_decomposer() -> Runnable:
+    return structured_llm(QuestionBreakdown)
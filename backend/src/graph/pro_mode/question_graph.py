@@ -0,0 +1,68 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Sequence, TypeVar
+
+from src.graph.pro_mode.schemas.questions import SubQuestion
+
+T = TypeVar("T")
+
+
+def question_dependencies(subquestions: Sequence[SubQuestion]) -> List[List[int]]:
+    """
+    The 0-based prerequisites of every subquestion.
+
+    Only references to earlier subquestions are kept, so the graph is acyclic and the first
+    subquestion never depends on anything.
+    """
+    return [
+        sorted({number - 1 for number in subquestion.depends_on if 1 <= number <= index})
+        for index, subquestion in enumerate(subquestions)
+    ]
+
+
+async def run_question_graph(
+    dependencies: List[List[int]],
+    answer_roots: Callable[[List[int]], Awaitable[Dict[int, T]]],
+    answer_dependent: Callable[[int, Dict[int, T]], Awaitable[T]],
+) -> Dict[int, T]:
+    """
+    Answers subquestions in dependency order, running everything that is ready at the same time.
+
+    The independent subquestions are answered together by one `answer_roots` call. Every dependent
+    subquestion starts as soon as all of its prerequisites are answered, without waiting for
+    unrelated ones, and runs concurrently with the rest.
+
+    Args:
+        dependencies: prerequisites of every subquestion, see `question_dependencies`.
+        answer_roots: answers the given independent subquestions, returns an answer for each.
+        answer_dependent: answers one dependent subquestion given the answers of its prerequisites.
+
+    Returns:
+        The answer of every subquestion by index.
+    """
+    roots = [index for index, prerequisites in enumerate(dependencies) if not prerequisites]
+    root_answers = asyncio.create_task(answer_roots(roots))
+    dependents: Dict[int, asyncio.Task] = {}
+
+    async def _answer(index: int) -> T:
+        if index in dependents:
+            return await dependents[index]
+        return (await root_answers)[index]
+
+    async def _dependent(index: int) -> T:
+        prerequisites = {prerequisite: await _answer(prerequisite) for prerequisite in dependencies[index]}
+        return await answer_dependent(index, prerequisites)
+
+    for index, prerequisites in enumerate(dependencies):
+        if prerequisites:
+            dependents[index] = asyncio.create_task(_dependent(index))
+    try:
+        answers = dict(await root_answers)
+        for index, task in dependents.items():
+            answers[index] = await task
+        return answers
+    finally:
+        tasks = (root_answers, *dependents.values())
+        for task in tasks:
+            task.cancel()
+        # Collects the errors of the tasks nobody awaited, so they are not reported as never retrieved
+        await asyncio.gather(*tasks, return_exceptions=True)
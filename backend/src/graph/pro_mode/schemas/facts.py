@@ -1,6 +1,7 @@
 from typing import List
 
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 
 
 class Fact(BaseModel):
@@ -9,6 +10,10 @@ class Fact(BaseModel):
         description="""A single, precise factual statement extracted from source text that directly contributes to answering the user's question. \
         Each fact should be self-contained, objective, and verifiable.""",
     )
+    source: int = Field(
+        0,
+        description="Number of the SOURCE block the fact was taken from",
+    )
 
 
 class Facts(BaseModel):
@@ -22,3 +27,5 @@ class Facts(BaseModel):
         description="""Comprehensive collection of ALL relevant factual statements, data points, and key information \
             extracted from the source text that collectively enable answering the user's question accurately and completely.""",
     )
+    # Filled in after extraction, not generated: URL of every source a fact's `source` number refers to
+    sources: SkipJsonSchema[List[str]] = Field(default_factory=list)
@@ -8,6 +8,11 @@ class SubQuestion(BaseModel):
         ...,
         description="A focused subquery that helps answer the main question",
     )
+    depends_on: List[int] = Field(
+        default_factory=list,
+        description="""Numbers (starting from 1) of the earlier subquestions whose answers are needed to ask this one, \
+        e.g. [1] for "Who founded the company from step 1?". Empty if the subquestion can be searched on its own.""",
+    )
 
 
 class QuestionBreakdown(BaseModel):
@@ -23,3 +28,11 @@ class QuestionBreakdown(BaseModel):
         ...,
         description="List of sequential, focused subquestions whose answers will solve the main question",
     )
+
+
+class ResolvedQuestion(BaseModel):
+    text: str = Field(
+        ...,
+        description="""The subquestion rewritten as a standalone search query: every reference to an earlier \
+        subquestion is replaced by the entity, date or value its answer established.""",
+    )
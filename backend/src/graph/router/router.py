@@ -4,11 +4,12 @@ from langchain_core.messages import HumanMessage, SystemMessage
 
 from src.graph.router.schemas.route import Route
 from src.graph.states.state import State
-from src.models.llm import llm
-
-router = llm.with_structured_output(Route)
+from src.models.llm import structured_llm
+from src.observability.metrics import instrumented_node
+from src.observability.tracing import annotate
 
 
+@instrumented_node("llm_call_router")
 async def llm_call_router(state: State):
     """
     Routes the user input to either pro-mode or simple-mode based on complexity.
@@ -18,17 +19,21 @@ async def llm_call_router(state: State):
 
     Returns:
         dict: A dictionary containing the routing decision with key 'decision' and value
-            being either 'pro' or 'simple'.
+            being either 'pro' or 'simple'. A decision already present in the state (a forced
+            mode) is kept as is.
     """
+    if state.get("decision"):
+        return {"decision": state["decision"]}
 
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Only the date, so that the same question routed on the same day hits the LLM cache
+    current_date = datetime.now().strftime("%Y-%m-%d")
 
-    decision = await router.ainvoke(
+    decision = await structured_llm(Route).ainvoke(
         [
             SystemMessage(
                 content=f"""You are a routing classifier that determines the complexity of user questions.
 
-                Current date and time: {current_time}
+                Current date: {current_date}
 
                 **Routing Guidelines:**
 
@@ -49,7 +54,7 @@ async def llm_call_router(state: State):
             HumanMessage(content=state["input"]),
         ]
     )
-    print(f"Decision: {decision}")
+    annotate(decision=decision.step)
     return {"decision": decision.step}
 
 
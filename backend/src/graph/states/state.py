@@ -1,4 +1,4 @@
-from typing import List, TypedDict
+from typing import Any, Dict, List, TypedDict
 
 from src.graph.pro_mode.schemas.facts import Facts
 from src.graph.pro_mode.schemas.questions import SubQuestion
@@ -11,4 +11,9 @@ class State(TypedDict):
     validation_attempts: int = 0
     validation_result: str
     sub_queries: List[SubQuestion]
+    decomposition_info: Dict[str, Any]
     facts: List[Facts]
+    facts_info: Dict[str, int]
+    validation_feedback: str
+    missing_information: List[str]
+    page_urls: List[str]
@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Optional
+
+TokenSink = Callable[[str], Awaitable[None]]
+
+_token_sink: ContextVar[Optional[TokenSink]] = ContextVar("token_sink", default=None)
+
+
+@contextmanager
+def stream_tokens(sink: TokenSink) -> Iterator[None]:
+    """
+    Sends the answer tokens generated inside the block to `sink`.
+
+    Tokens of a draft that is later discarded (e.g. text a model writes before deciding to call a
+    tool) are streamed as well, so the final answer of a run replaces whatever was streamed.
+
+    The sink is kept in a context variable, so it reaches the nodes through LangGraph and
+    `asyncio` tasks without being stored in the graph state.
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+async def emit_token(text: str) -> None:
+    sink = _token_sink.get()
+    if sink is not None and text:
+        await sink(text)
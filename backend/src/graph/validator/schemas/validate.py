@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal
 
 from pydantic import BaseModel, Field
 
@@ -9,3 +9,13 @@ class Validate(BaseModel):
         description="""Validating agent for multi-agent system's (MAS') response.
         Main goal is to check was the system answered the user's question or it's not""",
     )
+    feedback: str = Field(
+        "",
+        description="""If the question was not answered: what is missing, wrong or unclear in the response, \
+        written as instructions for rewriting it. Empty if the question was answered.""",
+    )
+    missing_information: List[str] = Field(
+        default_factory=list,
+        description="""If the question was not answered because facts are missing: short, self-contained search \
+        questions for exactly the missing facts (at most 3). Empty if the response only needs rewriting.""",
+    )
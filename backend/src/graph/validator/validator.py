@@ -1,10 +1,15 @@
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from src.config.engine import engine_settings
 from src.graph.states.state import State
 from src.graph.validator.schemas.validate import Validate
-from src.models.llm import llm
+from src.models.llm import structured_llm
+from src.observability.metrics import VALIDATION_RETRIES, VALIDATIONS, instrumented_node, state_mode
 
+MAX_MISSING_QUESTIONS = 3
 
+
+@instrumented_node("define_validating_agent")
 async def define_validating_agent(state: State):
     """
     Defines valiting agent to validate multi-agent system's response.
@@ -13,24 +18,36 @@ async def define_validating_agent(state: State):
         state: State - the current state object containing user input and conversation context.
 
     Returns:
-        A dictionary with key 'answer' with infomation about MAS answer: was the user's question answered or not.
+        A dictionary with the validation result ('yes' or 'no'), feedback on the response, the questions
+        that still have to be researched and the number of answers validated so far.
     """
-    validator = llm.with_structured_output(Validate)
-
-    answer = await validator.ainvoke(
+    answer = await structured_llm(Validate).ainvoke(
         [
             SystemMessage(
                 content="""You are a very attentive validation agent. Your aim is to validate your collegues response.
                 You will also perceive initial user's query. Compare initial user's query and your collegues response
                 to it. Return was the user's question answered or not. If question was answered - return only 'yes',
-                    else - return only 'no'. Return only one word. Think!"""
+                    else - return only 'no'. Think!
+                If you return 'no', explain in the feedback what has to be fixed, and list in missing_information
+                only the facts that still have to be researched; leave it empty if the response just has to be
+                rewritten from what is already known."""
             ),
             HumanMessage(content=state["input"]),
             AIMessage(content=state["output"]),
         ]
     )
 
-    return {"validation_result": answer.validation_result}
+    attempts = state.get("validation_attempts", 0) + 1
+    VALIDATIONS.labels(state_mode(state), answer.validation_result or "none").inc()
+    if answer.validation_result != "yes" and attempts < engine_settings.MAX_VALIDATION_ATTEMPTS:
+        VALIDATION_RETRIES.labels(state_mode(state)).inc()
+
+    return {
+        "validation_result": answer.validation_result,
+        "validation_feedback": answer.feedback,
+        "missing_information": answer.missing_information[:MAX_MISSING_QUESTIONS],
+        "validation_attempts": attempts,
+    }
 
 
 def validator_answer(state: State) -> str:
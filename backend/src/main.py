@@ -1,12 +1,41 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse, Response
 from src.api.api import api_router
+from src.api.services.startup import startup
+from src.api.services.task_manager import task_manager
+from src.models.http_client import http_pool
+from src.observability import metrics
 
 root_router = APIRouter()
 
 
+@root_router.get("/health")
+async def health() -> JSONResponse:
+    """Turns ready (200) once the warm-up has finished, reports 503 before that."""
+    return JSONResponse(startup.health(), status_code=200 if startup.status == "ready" else 503)
+
+
+@root_router.get("/metrics")
+async def get_metrics() -> Response:
+    """Prometheus metrics of the graph nodes, provider calls, caches and task queue."""
+    content, content_type = metrics.render()
+    return Response(content, media_type=content_type)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup.start()
+    yield
+    await startup.close()
+    await task_manager.close()
+    await http_pool.close()
+
+
 def prepare_app() -> FastAPI:
-    app = FastAPI(title="Researcher")
+    app = FastAPI(title="Researcher", lifespan=lifespan)
     app.include_router(api_router)
     app.include_router(root_router)
     return app
@@ -0,0 +1,98 @@
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.config.limits import limit_settings
+from src.models.governor import llm_governor
+from src.models.singleflight import flights
+from src.observability.metrics import record_tokens
+from src.observability.tracing import span
+from src.searches.selection import estimate_tokens
+
+
+class GovernedChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI whose requests go through the process-wide LLM governor.
+
+    Structured-output and tool-bound runnables derived from the model share the same limits.
+    Retries are left to the governor, so the OpenAI client is created with `max_retries=0`.
+    Identical non-streamed requests in flight at the same time are sent once.
+    """
+
+    def _estimate_tokens(self, messages: List[BaseMessage]) -> int:
+        prompt = sum(estimate_tokens(str(message.content)) for message in messages)
+        return prompt + (self.max_tokens or limit_settings.LLM_COMPLETION_TOKENS)
+
+    def _call_key(self, messages: List[BaseMessage], stop: Optional[List[str]], kwargs: Dict[str, Any]) -> str:
+        """Identity of a request: the model parameters, the messages without their ids, stop words and call options"""
+        request = {
+            "params": self._default_params,
+            "messages": [message.model_dump(exclude={"id"}) for message in messages],
+            "stop": stop,
+            "kwargs": kwargs,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._call_key(messages, stop, kwargs)
+        with span("llm generate", model=self.model_name, messages=len(messages)) as current:
+            coalesced = flights.in_flight("llm", key)
+            current.set(coalesced=coalesced)
+            result = await flights.run(
+                "llm", key, lambda: self._governed_generate(messages, stop, run_manager, **kwargs)
+            )
+            if coalesced:
+                result = result.model_copy(deep=True)
+            usage = getattr(result.generations[0].message, "usage_metadata", None) if result.generations else None
+            if usage:
+                current.set(prompt_tokens=usage["input_tokens"], completion_tokens=usage["output_tokens"])
+        return result
+
+    async def _governed_generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        **kwargs: Any,
+    ) -> ChatResult:
+        estimate = self._estimate_tokens(messages)
+        result = await llm_governor.run(
+            lambda: super(GovernedChatOpenAI, self)._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            tokens=estimate,
+            operation="generate",
+        )
+        usage = getattr(result.generations[0].message, "usage_metadata", None) if result.generations else None
+        if usage:
+            llm_governor.charge(usage["total_tokens"] - estimate)
+            record_tokens(usage)
+        return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # A stream cannot be replayed once chunks were handed out, so it is limited but not retried
+        estimate = self._estimate_tokens(messages)
+        with span("llm stream", model=self.model_name, messages=len(messages)) as current:
+            async with llm_governor.acquire(estimate, operation="stream"):
+                async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    usage = getattr(chunk.message, "usage_metadata", None)
+                    if usage:
+                        llm_governor.charge(usage["total_tokens"] - estimate)
+                        record_tokens(usage)
+                        current.set(prompt_tokens=usage["input_tokens"], completion_tokens=usage["output_tokens"])
+                    yield chunk
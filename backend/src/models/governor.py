@@ -0,0 +1,245 @@
+import asyncio
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from src.config.limits import limit_settings
+from src.observability.metrics import external_call, register_stats
+from src.observability.tracing import Span, span
+
+T = TypeVar("T")
+
+_STATUS_IN_MESSAGE = re.compile(r"\b(?:Error|HTTP) (\d{3})\b")
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units evenly over a minute and holds at most a minute's worth.
+
+    Waiters are served in arrival order. `per_minute=0` makes the bucket unlimited. The level is
+    shared by every event loop, the lock that orders waiters belongs to the running one.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self._capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._level = self._capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self, amount: float) -> None:
+        if not self._rate:
+            return
+        amount = min(amount, self._capacity)
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self._rate)
+
+    def charge(self, amount: float) -> None:
+        """Takes `amount` without waiting, the level may go negative to delay later callers"""
+        if self._rate:
+            self._refill()
+            self._level -= amount
+
+    def drain(self) -> None:
+        if self._rate:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self._capacity, self._level + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+def status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status of a provider error, if it carries one"""
+    if isinstance(getattr(exc, "status_code", None), int):
+        return exc.status_code
+    match = _STATUS_IN_MESSAGE.search(str(exc))
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth another attempt"""
+    status = status_code(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    transient = (asyncio.TimeoutError, httpx.TransportError)
+    return isinstance(exc, transient) or isinstance(exc.__cause__, transient)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class Governor:
+    """
+    Process-wide gate in front of one provider.
+
+    Every call waits for a concurrency slot, a request token and its estimated tokens, and is
+    retried with full-jitter exponential backoff on rate limits and transient errors. A 429 drains
+    the request bucket, so all waiting callers slow down together instead of retrying in a storm.
+    Concurrency slots are created in the running event loop, so scripts that start their own loop
+    with `asyncio.run` get fresh ones.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 0,
+        attempts: int = limit_settings.RETRY_ATTEMPTS,
+        base_delay: float = limit_settings.RETRY_BASE_DELAY,
+        max_delay: float = limit_settings.RETRY_MAX_DELAY,
+    ) -> None:
+        self.name = name
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._max_concurrency = max_concurrency
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._attempts = max(attempts, 1)
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._waiting = 0
+        self._in_flight = 0
+        self._stats = {"calls": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int = 0, operation: str = "call", attempt: int = 1) -> AsyncIterator[None]:
+        """Holds a slot for one attempt of an `operation` call estimated at `tokens` tokens"""
+        with span(f"{self.name} {operation} attempt", attempt=attempt, tokens_estimate=tokens or None) as current:
+            async with self._slot(tokens, current):
+                with external_call(self.name, operation):
+                    yield
+
+    @asynccontextmanager
+    async def _slot(self, tokens: int, current: Span) -> AsyncIterator[None]:
+        queued_at = time.monotonic()
+        slots = self._loop_slots()
+        self._waiting += 1
+        try:
+            if slots is not None:
+                await slots.acquire()
+            try:
+                await self._requests.acquire(1)
+                await self._tokens.acquire(tokens)
+            except BaseException:
+                if slots is not None:
+                    slots.release()
+                raise
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - queued_at
+        current.set(queue_wait_seconds=round(waited, 4))
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._stats["calls"] += 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if slots is not None:
+                slots.release()
+
+    async def run(self, call: Callable[[], Awaitable[T]], tokens: int = 0, operation: str = "call") -> T:
+        """
+        Runs `call` under the limits, retrying transient failures.
+
+        Args:
+            call: coroutine function making one provider request.
+            tokens: estimated tokens of the request, charged against the token bucket.
+            operation: kind of request, labels its latency metrics.
+
+        Returns:
+            The result of the first successful attempt.
+        """
+        for attempt in range(self._attempts):
+            try:
+                async with self.acquire(tokens, operation, attempt + 1):
+                    return await call()
+            except Exception as exc:  # pylint: disable=broad-except
+                if not is_retryable(exc) or attempt + 1 == self._attempts:
+                    self._stats["failures"] += 1
+                    raise
+                delay = self._backoff(attempt, exc)
+                print(f"{self.name} call failed ({exc!r}), retrying in {delay:.1f} s")
+            self._stats["retries"] += 1
+            with span(f"{self.name} {operation} backoff", attempt=attempt + 1, delay_seconds=round(delay, 3)):
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def charge(self, tokens: int) -> None:
+        """Accounts tokens the estimate missed, once the real usage is known"""
+        self._tokens.charge(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self._stats["calls"]
+        return {
+            **self._stats,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self._max_concurrency,
+            "queue_wait_avg_seconds": round(self._wait_total / calls, 4) if calls else 0.0,
+            "queue_wait_max_seconds": round(self._wait_max, 4),
+        }
+
+    def _loop_slots(self) -> Optional[asyncio.Semaphore]:
+        """The concurrency slots of the running event loop, None when concurrency is unlimited"""
+        if not self._max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots, self._loop = asyncio.Semaphore(self._max_concurrency), loop
+        return self._slots
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        delay = random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+        if status_code(exc) == 429:
+            self._stats["rate_limited"] += 1
+            self._requests.drain()
+            delay = max(delay, _retry_after(exc) or 0.0)
+        return delay
+
+
+llm_governor = Governor(
+    "llm",
+    requests_per_minute=limit_settings.LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=limit_settings.LLM_TOKENS_PER_MINUTE,
+    max_concurrency=limit_settings.LLM_MAX_CONCURRENCY,
+)
+tavily_governor = Governor(
+    "tavily",
+    requests_per_minute=limit_settings.TAVILY_REQUESTS_PER_MINUTE,
+    max_concurrency=limit_settings.TAVILY_MAX_CONCURRENCY,
+)
+
+
+def governor_stats() -> Dict[str, Dict[str, Any]]:
+    return {governor.name: governor.stats() for governor in (llm_governor, tavily_governor)}
+
+
+register_stats("researcher_governor", "service", governor_stats)
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import Callable, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.config.http import http_settings
+
+
+class HttpPool:
+    """
+    Owns the async HTTP connection pool shared by the LLM and Tavily clients.
+
+    The client is created on first use, so clients built at import time can hold it, while its
+    connections are opened by `warm_up` in the application lifespan and released by `close`. A
+    closed pool opens a new client on next use; objects built on the old one register `on_close`
+    to be rebuilt too.
+    Setting `transport` before first use replaces the network, the offline benchmark relies on it.
+    """
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+        self.transport: Optional[httpx.AsyncBaseTransport] = None
+        self._on_close: List[Callable[[], None]] = []
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self._http2_available(),
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=http_settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=http_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=http_settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(http_settings.HTTP_TIMEOUT, connect=http_settings.HTTP_CONNECT_TIMEOUT),
+            )
+        return self._client
+
+    async def warm_up(self, urls: Iterable[str]) -> None:
+        """Opens HTTP_WARMUP_CONNECTIONS keep-alive connections to the origin of every url"""
+        origins = {f"{parts.scheme}://{parts.netloc}" for parts in map(urlsplit, urls) if parts.netloc}
+        if not origins or http_settings.HTTP_WARMUP_CONNECTIONS <= 0:
+            return
+        started = time.monotonic()
+        requests = [self._touch(origin) for origin in origins for _ in range(http_settings.HTTP_WARMUP_CONNECTIONS)]
+        results = await asyncio.gather(*requests)
+        print(
+            f"Warmed up {sum(results)}/{len(results)} connections to {len(origins)} hosts "
+            f"in {time.monotonic() - started:.2f} s"
+        )
+
+    def on_close(self, callback: Callable[[], None]) -> None:
+        """Calls `callback` whenever the pool is closed, to drop what holds the closed client"""
+        self._on_close.append(callback)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+            for callback in self._on_close:
+                callback()
+
+    async def _touch(self, origin: str) -> bool:
+        try:
+            await self.client.head(origin, timeout=http_settings.HTTP_WARMUP_TIMEOUT)
+        except httpx.HTTPError as exc:
+            print(f"Warm-up of {origin} failed: {exc!r}")
+            return False
+        return True
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if not http_settings.HTTP2:
+            return False
+        try:
+            import h2  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            print("HTTP2 is enabled but the h2 package is not installed, falling back to HTTP/1.1")
+            return False
+        return True
+
+
+http_pool = HttpPool()
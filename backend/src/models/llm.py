@@ -1,12 +1,42 @@
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, Type
 
-from src.config.settings import LLM_SETTINGS
+from pydantic import BaseModel
 
-settings = LLM_SETTINGS
+from src.config.settings import get_llm_settings
+from src.models.http_client import http_pool
 
-llm = ChatOpenAI(
-    model=settings.LLM_NAME,
-    verbose=True,
-    base_url=settings.LLM_HOST,
-    api_key=settings.API_KEY,
-)
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+
+    from src.models.chat import GovernedChatOpenAI
+
+
+@lru_cache(maxsize=None)
+def get_llm() -> "GovernedChatOpenAI":
+    """The shared chat model, built on first use together with the OpenAI client it imports."""
+    from src.models.chat import GovernedChatOpenAI  # pylint: disable=import-outside-toplevel
+
+    settings = get_llm_settings()
+    return GovernedChatOpenAI(
+        model=settings.LLM_NAME,
+        verbose=True,
+        base_url=settings.LLM_HOST,
+        api_key=settings.API_KEY,
+        max_retries=0,
+        stream_usage=True,
+        http_async_client=http_pool.client,
+    )
+
+
+@lru_cache(maxsize=None)
+def structured_llm(schema: Type[BaseModel]) -> "Runnable":
+    """The shared chat model bound to return `schema`, built once per schema, its responses are cached."""
+    from src.models.llm_cache import CachedStructuredLLM  # pylint: disable=import-outside-toplevel
+
+    llm = get_llm()
+    return CachedStructuredLLM(llm.with_structured_output(schema), schema, llm.model_name)
+
+
+http_pool.on_close(get_llm.cache_clear)
+http_pool.on_close(structured_llm.cache_clear)
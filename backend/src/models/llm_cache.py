@@ -0,0 +1,70 @@
+import json
+from typing import Any, List, Optional, Type
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage, HumanMessage, convert_to_messages
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+from pydantic import BaseModel
+
+from src.config.cache import cache_settings
+from src.observability.metrics import register_stats
+from src.observability.tracing import span
+from src.searches.cache import TTLCache
+
+llm_cache = TTLCache(
+    path=cache_settings.LLM_CACHE_PATH,
+    memory_items=cache_settings.LLM_CACHE_MEMORY_ITEMS,
+    disk_max_items=cache_settings.LLM_CACHE_DISK_MAX_ITEMS,
+    enabled=cache_settings.LLM_CACHE_ENABLED,
+)
+register_stats("researcher_llm_cache", "namespace", llm_cache.stats)
+
+
+def _messages(value: LanguageModelInput) -> List[BaseMessage]:
+    if isinstance(value, PromptValue):
+        return value.to_messages()
+    if isinstance(value, str):
+        return [HumanMessage(content=value)]
+    return convert_to_messages(value)
+
+
+class CachedStructuredLLM(Runnable):
+    """
+    Structured-output runnable that answers byte-identical requests from `llm_cache`.
+
+    Entries are keyed by the model, the output schema and the messages (without their ids) and
+    namespaced by the schema name, which picks their TTL from LLM_CACHE_TTL. A hit makes no
+    request at all. Only `ainvoke` is cached, the pipeline never calls the model synchronously.
+    """
+
+    def __init__(self, runnable: Runnable, schema: Type[BaseModel], model: str) -> None:
+        self._runnable = runnable
+        self._schema = schema
+        self._namespace = schema.__name__
+        self._ttl = cache_settings.LLM_CACHE_TTL.get(self._namespace, 0) if cache_settings.LLM_CACHE_ENABLED else 0
+        self._identity = {"model": model, "schema": schema.model_json_schema()}
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self._runnable.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        if self._ttl <= 0:
+            return await self._runnable.ainvoke(input, config, **kwargs)
+
+        request = {
+            **self._identity,
+            "messages": [message.model_dump(exclude={"id"}) for message in _messages(input)],
+            "kwargs": kwargs,
+        }
+        raw_key = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        with span("llm cache", schema=self._namespace) as current:
+            cached = await llm_cache.get(self._namespace, raw_key)
+            current.set(cached=cached is not None)
+        if cached is not None:
+            return self._schema.model_validate(cached)
+
+        result = await self._runnable.ainvoke(input, config, **kwargs)
+        if isinstance(result, self._schema):
+            await llm_cache.set(self._namespace, raw_key, result.model_dump(mode="json"), self._ttl)
+        return result
@@ -0,0 +1,86 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Tuple, TypeVar
+
+from src.config.limits import limit_settings
+from src.observability.metrics import register_stats
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight:
+    call: "asyncio.Future[Any]"
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call is in flight, callers with the same key
+    share its result (or its error) instead of starting their own.
+
+    Nothing is kept once the call has finished, repeated calls are left to the caches. A caller
+    that is cancelled only stops waiting; the call itself is cancelled once nobody waits for it.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._flights: Dict[Tuple[str, str], _Flight] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def in_flight(self, namespace: str, key: str) -> bool:
+        return (namespace, key) in self._flights
+
+    def run(self, namespace: str, key: str, call: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """
+        Starts `call`, or joins the call already in flight under the same key.
+
+        The call is registered before this returns, so callers that come later in the same step
+        of the event loop join it.
+
+        Args:
+            namespace: kind of call, calls are counted per namespace.
+            key: identity of the call within the namespace.
+            call: starts the call, invoked only when none is in flight.
+
+        Returns:
+            A future of the call's result, owned by this caller.
+        """
+        if not self.enabled:
+            return asyncio.ensure_future(call())
+        flight = self._flights.get((namespace, key))
+        if flight is None:
+            flight = self._flights[(namespace, key)] = _Flight(asyncio.ensure_future(call()))
+            flight.call.add_done_callback(lambda _: self._land(namespace, key, flight))
+            self._count(namespace, "calls")
+        else:
+            self._count(namespace, "coalesced")
+        flight.waiters += 1
+        waiter = asyncio.shield(flight.call)
+        waiter.add_done_callback(lambda _: self._leave(flight))
+        return waiter
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for namespace, counters in self._stats.items():
+            requests = counters["calls"] + counters["coalesced"]
+            result[namespace] = {**counters, "coalesced_ratio": counters["coalesced"] / requests if requests else 0.0}
+        return result
+
+    def _land(self, namespace: str, key: str, flight: _Flight) -> None:
+        if self._flights.get((namespace, key)) is flight:
+            del self._flights[(namespace, key)]
+
+    @staticmethod
+    def _leave(flight: _Flight) -> None:
+        flight.waiters -= 1
+        if flight.waiters == 0 and not flight.call.done():
+            flight.call.cancel()
+
+    def _count(self, namespace: str, counter: str) -> None:
+        counters = self._stats.setdefault(namespace, {"calls": 0, "coalesced": 0})
+        counters[counter] += 1
+
+
+flights = SingleFlight(enabled=limit_settings.CALL_COALESCING)
+register_stats("researcher_singleflight", "namespace", flights.stats)
@@ -0,0 +1,122 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterator, Mapping, Tuple, TypeVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+from src.observability.tracing import exporter, span
+
+T = TypeVar("T")
+
+# From a cached search to a pro-mode fact retrieval over a dozen pages
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+
+NODE_SECONDS = Histogram(
+    "researcher_node_duration_seconds",
+    "Duration of graph node calls",
+    ["node", "mode", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "researcher_external_call_duration_seconds",
+    "Duration of single LLM and Tavily requests, retries are observed separately",
+    ["service", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter("researcher_llm_tokens_total", "LLM tokens reported by the provider", ["node", "mode", "kind"])
+VALIDATIONS = Counter("researcher_validations_total", "Validator verdicts on answer drafts", ["mode", "result"])
+VALIDATION_RETRIES = Counter("researcher_validation_retries_total", "Answer drafts revised after a rejection", ["mode"])
+TASKS = Counter("researcher_tasks_total", "Finished tasks", ["mode", "status"])
+TASKS_COALESCED = Counter("researcher_tasks_coalesced_total", "Tasks that joined an identical task in flight")
+TASK_QUEUE_DEPTH = Gauge("researcher_task_queue_depth", "Tasks waiting for a worker")
+TASKS_IN_FLIGHT = Gauge("researcher_tasks_in_flight", "Tasks running on a worker")
+
+# Graph node and mode the current coroutine works for, LLM token counts are attributed to them
+_node: ContextVar[Tuple[str, str]] = ContextVar("metrics_node", default=("none", "auto"))
+
+
+def state_mode(state: Mapping[str, Any]) -> str:
+    return state.get("decision") or "auto"
+
+
+def instrumented_node(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Times a graph node in a span and a histogram, and attributes the LLM tokens it spends to it."""
+
+    def decorator(node: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @wraps(node)
+        async def wrapper(state: Mapping[str, Any], *args: Any, **kwargs: Any) -> T:
+            mode = state_mode(state)
+            token = _node.set((name, mode))
+            started = time.monotonic()
+            outcome = "error"
+            try:
+                with span(f"node {name}", node=name, mode=mode):
+                    result = await node(state, *args, **kwargs)
+                outcome = "ok"
+                if isinstance(result, Mapping) and result.get("decision"):
+                    mode = result["decision"]
+                return result
+            finally:
+                NODE_SECONDS.labels(name, mode, outcome).observe(time.monotonic() - started)
+                _node.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def external_call(service: str, operation: str) -> Iterator[None]:
+    """Observes the duration and outcome of one request to a provider"""
+    started = time.monotonic()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation, outcome).observe(time.monotonic() - started)
+
+
+def record_tokens(usage: Mapping[str, int]) -> None:
+    """Counts the `usage_metadata` of an LLM response for the node being run"""
+    node, mode = _node.get()
+    LLM_TOKENS.labels(node, mode, "prompt").inc(usage.get("input_tokens", 0))
+    LLM_TOKENS.labels(node, mode, "completion").inc(usage.get("output_tokens", 0))
+
+
+class StatsCollector:
+    """Exposes the numbers of a `stats()` mapping, one entry per label value, as gauges."""
+
+    def __init__(self, prefix: str, label: str, stats: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+        self._prefix = prefix
+        self._label = label
+        self._stats = stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        families: Dict[str, GaugeMetricFamily] = {}
+        for key, values in self._stats().items():
+            for name, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                family = families.get(name)
+                if family is None:
+                    family = families[name] = GaugeMetricFamily(
+                        f"{self._prefix}_{name}", f"{name} from {self._prefix} stats", labels=[self._label]
+                    )
+                family.add_metric([key], value)
+        yield from families.values()
+
+
+def register_stats(prefix: str, label: str, stats: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+    REGISTRY.register(StatsCollector(prefix, label, stats))
+
+
+def render() -> Tuple[bytes, str]:
+    """The current metrics in the Prometheus text format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+register_stats("researcher_trace_spans", "exporter", lambda: {"jsonl": exporter.stats()})
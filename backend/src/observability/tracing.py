@@ -0,0 +1,204 @@
+import atexit
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.config.tracing import tracing_settings
+
+# OTLP status codes
+_STATUS_UNSET = 0
+_STATUS_ERROR = 2
+
+_STOP = object()
+
+
+@dataclass
+class Span:
+    """
+    One timed operation of a trace.
+
+    Spans of unsampled traces still carry ids, so a trace id can be handed out for every request,
+    but they record no attributes and are never exported.
+    """
+
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    sampled: bool
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        if self.sampled:
+            self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": _STATUS_UNSET} if self.error is None else {"code": _STATUS_ERROR, "message": self.error},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class SpanExporter:
+    """
+    Appends finished spans to a JSON lines file in the OTLP/JSON format, one batch per line.
+
+    Spans are handed to a background thread through a bounded queue, so finishing a span never
+    blocks the event loop; when the queue is full the span is dropped and counted instead.
+    """
+
+    def __init__(self, path: Path, queue_max: int, batch_size: int, service_name: str) -> None:
+        self._path = path
+        self._batch_size = batch_size
+        self._resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_max)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, span: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Writes the queued spans and stops the thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"exported": self.exported, "dropped": self.dropped, "queued": self._queue.qsize()}
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not _STOP]
+            if spans:
+                self._write(spans)
+            if len(spans) < len(batch):
+                return
+
+    def _write(self, spans: List[Span]) -> None:
+        line = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [{"scope": {"name": "src.observability"}, "spans": [s.to_otlp() for s in spans]}],
+                }
+            ]
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as file:
+                file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        except OSError as exc:
+            self.dropped += len(spans)
+            print(f"Writing {len(spans)} spans failed: {exc!r}")
+            return
+        self.exported += len(spans)
+
+
+exporter = SpanExporter(
+    path=tracing_settings.TRACE_PATH,
+    queue_max=tracing_settings.TRACE_QUEUE_MAX,
+    batch_size=tracing_settings.TRACE_BATCH_SIZE,
+    service_name=tracing_settings.TRACE_SERVICE_NAME,
+)
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attributes: Any) -> None:
+    """Adds attributes to the current span, if it is sampled"""
+    current = _current.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Times the enclosed block as a child of the current span, or as the root of a new trace.
+
+    Whether a trace is sampled is decided once at its root, with probability TRACE_SAMPLE_RATE.
+    Tasks created inside the block inherit the span as their parent.
+    """
+    parent = _current.get()
+    if parent is None:
+        sampled = tracing_settings.TRACE_ENABLED and random.random() < tracing_settings.TRACE_SAMPLE_RATE
+        current = Span(os.urandom(16).hex(), os.urandom(8).hex(), None, name, sampled)
+    else:
+        current = Span(parent.trace_id, os.urandom(8).hex(), parent.span_id, name, parent.sampled)
+    current.set(**attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = repr(exc)
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Exited from another context, e.g. an async generator closed by the garbage collector
+            pass
+        if current.sampled:
+            current.end_ns = time.time_ns()
+            exporter.export(current)
@@ -0,0 +1,346 @@
+"""
+Offline benchmark of the simple and pro flows against local fakes of the LLM and Tavily.
+
+Usage:
+    python -m src.scripts.benchmark [--tasks 20] [--engine tasks|graph] [--save-baseline FILE]
+    python -m src.scripts.benchmark --baseline benchmarks/baseline.json
+
+The fakes answer at the HTTP layer of the shared connection pool, so the real clients, governors,
+parsers and graph nodes are measured and nothing leaves the machine. Every flow runs `--tasks`
+questions at once, through TaskManager (`tasks`) or the router graph (`graph`), after one
+untimed question that loads the pipeline. The report has per-node latency, wall-clock time,
+achieved concurrency, event-loop lag and memory per task. With `--baseline` the run fails
+(exit code 1) when a gated metric regresses beyond `--tolerance`, and is refused (exit code 2)
+when its workload settings differ from the baseline's.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from src.scripts.benchmark.fakes import FakeProfile, FakeProviderTransport, Latency
+
+# Applied before the pipeline is imported; set any of them explicitly to override
+BENCHMARK_ENV = {
+    "LLM_NAME": "bench-model",
+    "LLM_HOST": "http://llm.bench/v1",
+    "API_KEY": "bench",
+    "TAVILY_API_KEY": "bench",
+    "TAVILY_MAX_RESULTS": "5",
+    "CACHE_ENABLED": "false",
+    "LLM_CACHE_ENABLED": "false",
+    "TASK_STORE": "memory",
+    "CHECKPOINTER": "memory",
+    "TASK_QUEUE_MAX": "100000",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "TAVILY_REQUESTS_PER_MINUTE": "0",
+}
+
+# Settings that change the measured workload; a baseline is only compared to runs that share them
+WORKLOAD_SETTINGS = (
+    "tasks",
+    "engine",
+    "llm_latency",
+    "llm_tokens_per_second",
+    "search_latency",
+    "extract_latency",
+    "sigma",
+    "completion_words",
+    "list_items",
+    "page_words",
+    "reject_rate",
+    "seed",
+    "warmup",
+)
+
+# Gated metrics regress only when they grow by more than the tolerance and this absolute slack
+GATE_SLACK = {"seconds": 0.05, "kb": 64.0}
+
+LAG_INTERVAL = 0.005
+
+Intervals = List[Tuple[float, float]]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def _at(share: float) -> float:
+        return round(ordered[min(int(share * len(ordered)), len(ordered) - 1)], 4)
+
+    return {"count": len(ordered), "p50": _at(0.5), "p95": _at(0.95), "max": round(ordered[-1], 4)}
+
+
+def concurrency(intervals: Intervals, wall: float) -> Dict[str, float]:
+    """Peak and time-averaged number of tasks running at once"""
+    edges = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    running = peak = 0
+    for _, step in edges:
+        running += step
+        peak = max(peak, running)
+    busy = sum(end - start for start, end in intervals)
+    return {"max": peak, "avg": round(busy / wall, 2) if wall else 0.0}
+
+
+class NodeTimer:
+    """Wraps the graph nodes to record how long every call takes."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def install(self) -> None:
+        """Must run before the router graph is built, it binds the nodes when it is compiled"""
+        # pylint: disable=import-outside-toplevel
+        from src.graph import nodes
+
+        for name in nodes.__all__:
+            node = getattr(nodes, name)
+            if not inspect.iscoroutinefunction(node):
+                continue
+            timed = self._wrap(name, node)
+            setattr(nodes, name, timed)
+            setattr(sys.modules[node.__module__], name, timed)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def _wrap(self, name: str, node: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(node)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.monotonic()
+            try:
+                return await node(*args, **kwargs)
+            finally:
+                self.samples[name].append(time.monotonic() - started)
+
+        return timed
+
+
+async def _measure_lag(samples: List[float]) -> None:
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(time.monotonic() - started - LAG_INTERVAL)
+
+
+async def _run_tasks(mode: str, count: int) -> Tuple[Intervals, Intervals, int]:
+    """Returns the queued-to-finished and the running interval of every task and the number of successes"""
+    from src.api.services.task_manager import TaskManager  # pylint: disable=import-outside-toplevel
+
+    manager = TaskManager()
+    latencies: Intervals = []
+    running: Intervals = []
+    finished = asyncio.Event()
+    run_task = manager._process_task  # pylint: disable=protected-access
+
+    async def _process_task(*args: Any) -> None:
+        started = time.monotonic()
+        try:
+            await run_task(*args)
+        finally:
+            latencies.append((created[args[0]], time.monotonic()))
+            running.append((started, time.monotonic()))
+            if len(latencies) == count:
+                finished.set()
+
+    manager._process_task = _process_task  # pylint: disable=protected-access
+    created: Dict[str, float] = {}
+    task_ids = []
+    for index in range(count):
+        started = time.monotonic()
+        task_id = await manager.create_task(f"Benchmark question {index} about {mode} mode", forced_mode=mode)
+        created[task_id] = started
+        task_ids.append(task_id)
+    await finished.wait()
+    payloads = [await manager.get_task_payload(task_id) for task_id in task_ids]
+    await manager.close()
+    return latencies, running, sum(payload["status"] == "succeeded" for payload in payloads)
+
+
+async def _run_graph(mode: str, count: int) -> Tuple[Intervals, Intervals, int]:
+    from src.api.services.batch import answer_query  # pylint: disable=import-outside-toplevel
+
+    async def _one(index: int) -> Tuple[float, float]:
+        started = time.monotonic()
+        await answer_query(f"Benchmark question {index} about {mode} mode", mode)
+        return started, time.monotonic()
+
+    results = await asyncio.gather(*(_one(index) for index in range(count)), return_exceptions=True)
+    intervals = [result for result in results if not isinstance(result, BaseException)]
+    return intervals, intervals, len(intervals)
+
+
+async def run_flow(
+    mode: str, args: argparse.Namespace, timer: NodeTimer, transport: FakeProviderTransport
+) -> Dict[str, Any]:
+    if args.warmup:
+        await (_run_tasks if args.engine == "tasks" else _run_graph)(mode, 1)
+    timer.reset()
+    transport.calls.clear()
+    transport.bytes_sent.clear()
+    lag: List[float] = []
+    if args.memory:
+        tracemalloc.start()
+    baseline_memory = tracemalloc.get_traced_memory()[0] if args.memory else 0
+    monitor = asyncio.create_task(_measure_lag(lag))
+
+    started = time.monotonic()
+    run = _run_tasks if args.engine == "tasks" else _run_graph
+    latencies, running, succeeded = await run(mode, args.tasks)
+    wall = time.monotonic() - started
+
+    monitor.cancel()
+    peak_memory = tracemalloc.get_traced_memory()[1] if args.memory else 0
+    if args.memory:
+        tracemalloc.stop()
+    achieved = concurrency(running, wall)
+    return {
+        "tasks": args.tasks,
+        "succeeded": succeeded,
+        "wall_seconds": round(wall, 3),
+        "task_seconds": percentiles([end - start for start, end in latencies]),
+        "nodes": {name: percentiles(samples) for name, samples in sorted(timer.samples.items())},
+        "concurrency": achieved,
+        "loop_lag_seconds": percentiles(lag),
+        "memory": {
+            "peak_mb": round((peak_memory - baseline_memory) / 2**20, 2),
+            "per_task_kb": round((peak_memory - baseline_memory) / 1024 / max(achieved["max"], 1), 1),
+        },
+        "calls": dict(transport.calls),
+        "bytes": dict(transport.bytes_sent),
+    }
+
+
+def gated_metrics(report: Dict[str, Any]) -> Dict[str, Tuple[float, str]]:
+    """
+    Metrics compared against the baseline, with the unit that selects their slack.
+
+    Event-loop lag is only reported: it depends on the host more than on the code.
+    """
+    metrics = {}
+    for mode, flow in report["flows"].items():
+        metrics[f"{mode}.wall_seconds"] = (flow["wall_seconds"], "seconds")
+        metrics[f"{mode}.task_seconds.p95"] = (flow["task_seconds"]["p95"], "seconds")
+        if report["settings"]["memory"]:
+            metrics[f"{mode}.memory.per_task_kb"] = (flow["memory"]["per_task_kb"], "kb")
+        for name, node in flow["nodes"].items():
+            metrics[f"{mode}.nodes.{name}.p50"] = (node["p50"], "seconds")
+    return metrics
+
+
+def mismatched_settings(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Workload settings of the run that differ from those of the baseline"""
+    mismatches = []
+    for name in WORKLOAD_SETTINGS:
+        value, expected = report["settings"].get(name), baseline["settings"].get(name)
+        if value != expected:
+            mismatches.append(f"{name}: {value} vs baseline {expected}")
+    return mismatches
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    current = gated_metrics(report)
+    regressions = []
+    for name, (expected, unit) in gated_metrics(baseline).items():
+        if name not in current:
+            continue
+        value = current[name][0]
+        if value > expected * (1 + tolerance) + GATE_SLACK[unit]:
+            regressions.append(f"{name}: {value} vs baseline {expected}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=20, help="questions run at once in every flow")
+    parser.add_argument("--flows", nargs="+", choices=("simple", "pro"), default=["simple", "pro"])
+    parser.add_argument("--engine", choices=("tasks", "graph"), default="tasks")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="median seconds to the first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.3, help="median seconds of a search")
+    parser.add_argument("--extract-latency", type=float, default=0.6, help="median seconds of an extract")
+    parser.add_argument("--sigma", type=float, default=0.5, help="spread of the log-normal latencies")
+    parser.add_argument("--completion-words", type=int, default=40)
+    parser.add_argument("--list-items", type=int, default=3)
+    parser.add_argument("--page-words", type=int, default=2_000)
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="share of rejected validations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="measure the first task too")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc")
+    parser.add_argument("--output", type=Path, help="write the report to this file")
+    parser.add_argument("--save-baseline", type=Path, help="store the report as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="fail when the run regresses against this report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's own output")
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace) -> int:
+    for name, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(name, value)
+    # pylint: disable=import-outside-toplevel
+    from src.graph.engine import engine
+    from src.models.http_client import http_pool
+
+    profile = FakeProfile(
+        llm=Latency(args.llm_latency, args.sigma),
+        llm_tokens_per_second=args.llm_tokens_per_second,
+        search=Latency(args.search_latency, args.sigma),
+        extract=Latency(args.extract_latency, args.sigma),
+        completion_words=args.completion_words,
+        list_items=args.list_items,
+        page_words=args.page_words,
+        reject_rate=args.reject_rate,
+        seed=args.seed,
+    )
+    transport = FakeProviderTransport(profile)
+    http_pool.transport = transport
+    timer = NodeTimer()
+    timer.install()
+
+    settings = {name: value for name, value in vars(args).items() if not isinstance(value, Path)}
+    report: Dict[str, Any] = {"settings": settings, "flows": {}}
+    # Only the devnull handle is closed afterwards, never the real stdout
+    output = contextlib.nullcontext(sys.stdout) if args.verbose else open(os.devnull, "w", encoding="utf-8")
+    try:
+        with output as stream, contextlib.redirect_stdout(stream):
+            for mode in args.flows:
+                report["flows"][mode] = await run_flow(mode, args, timer, transport)
+    finally:
+        await engine.close()
+        await http_pool.close()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    for path in filter(None, (args.output, args.save_baseline)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n", encoding="utf-8")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    mismatches = mismatched_settings(report, baseline)
+    if mismatches:
+        for mismatch in mismatches:
+            print(f"Not comparable with the baseline, {mismatch}")
+        return 2
+    regressions = compare(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
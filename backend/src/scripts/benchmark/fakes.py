@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict
+
+import httpx
+
+_VOCABULARY = [
+    f"{stem}{suffix}"
+    for stem in ("data", "market", "city", "energy", "model", "river", "price", "report", "growth", "policy")
+    for suffix in ("", "s", "al", "ing", "ed", "er", "ion", "ity", "ive", "ous")
+] + [str(year) for year in range(1950, 2026)]
+
+# Prompts carry the current time, it must not change the responses between runs
+_TIMESTAMP = re.compile(rb"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+
+@dataclass
+class Latency:
+    """Log-normal latency with the given median in seconds, `sigma` controls the tail."""
+
+    median: float
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median * rng.lognormvariate(0.0, self.sigma) if self.median > 0 else 0.0
+
+
+@dataclass
+class FakeProfile:
+    """
+    Latencies and payload sizes of the fake providers.
+
+    Attributes:
+        llm: time to the first token of a chat completion
+        llm_tokens_per_second: streaming speed of completions, 0 sends the whole completion at once
+        search: latency of a Tavily search
+        extract: latency of a Tavily extract
+        completion_words: words in every generated string field and text completion
+        list_items: items in every generated list, e.g. subquestions and facts
+        search_results: results of every search
+        page_words: words of every extracted page
+        url_pool: distinct URLs searches draw from, a smaller pool means more shared pages
+        reject_rate: share of validator calls that reject the answer
+        seed: seed of every random choice
+    """
+
+    llm: Latency = field(default_factory=lambda: Latency(1.0))
+    llm_tokens_per_second: float = 0.0
+    search: Latency = field(default_factory=lambda: Latency(0.5))
+    extract: Latency = field(default_factory=lambda: Latency(1.0))
+    completion_words: int = 40
+    list_items: int = 3
+    search_results: int = 5
+    page_words: int = 2_000
+    url_pool: int = 500
+    reject_rate: float = 0.0
+    seed: int = 0
+
+
+class FakeProviderTransport(httpx.AsyncBaseTransport):
+    """
+    Answers OpenAI chat completion and Tavily search/extract requests locally.
+
+    Structured outputs are generated from the JSON schema sent with the request, tool-calling
+    requests call the first tool once and then answer, streaming requests are sent as SSE chunks.
+    Random choices are seeded by the request body, so identical requests get identical responses.
+    """
+
+    def __init__(self, profile: FakeProfile) -> None:
+        self.profile = profile
+        self.calls: Counter = Counter()
+        self.bytes_sent: Counter = Counter()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread() or b"{}")
+        digest = hashlib.sha256(_TIMESTAMP.sub(b"", request.content)).hexdigest()
+        rng = random.Random(f"{self.profile.seed}:{digest}")
+        path = request.url.path
+        if path.endswith("/chat/completions"):
+            kind, delay = "llm", self.profile.llm.sample(rng)
+        elif path.endswith("/search"):
+            kind, delay = "search", self.profile.search.sample(rng)
+        elif path.endswith("/extract"):
+            kind, delay = "extract", self.profile.extract.sample(rng)
+        else:
+            return httpx.Response(404, json={"detail": {"error": f"Unknown path {path}"}})
+
+        self.calls[kind] += 1
+        await asyncio.sleep(delay)
+        if kind == "llm" and body.get("stream"):
+            return httpx.Response(
+                200, headers={"content-type": "text/event-stream"}, stream=_Stream(self._chunks(body, rng), self, kind)
+            )
+        if kind == "llm":
+            payload = _completion(body, self._message(body, rng))
+        elif kind == "search":
+            payload = self._search(body, rng)
+        else:
+            payload = self._extract(body)
+        content = json.dumps(payload).encode("utf-8")
+        self.bytes_sent[kind] += len(content)
+        return httpx.Response(200, content=content, headers={"content-type": "application/json"})
+
+    def _words(self, rng: random.Random, count: int) -> str:
+        return " ".join(rng.choices(_VOCABULARY, k=count))
+
+    def _message(self, body: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            return {"role": "assistant", "content": json.dumps(self._value(schema, schema, rng, ""))}
+        tools = body.get("tools") or []
+        if tools and body["messages"][-1].get("role") != "tool":
+            function = tools[0]["function"]
+            arguments = self._value(function.get("parameters", {}), function.get("parameters", {}), rng, "")
+            return {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": f"call_{rng.getrandbits(32):08x}",
+                        "type": "function",
+                        "function": {"name": function["name"], "arguments": json.dumps(arguments)},
+                    }
+                ],
+            }
+        return {
+            "role": "assistant",
+            "content": self._words(rng, self.profile.completion_words * self.profile.list_items),
+        }
+
+    def _value(self, schema: Dict[str, Any], root: Dict[str, Any], rng: random.Random, name: str) -> Any:
+        if "$ref" in schema:
+            target = root
+            for part in schema["$ref"].lstrip("#/").split("/"):
+                target = target[part]
+            return self._value(target, root, rng, name)
+        if "anyOf" in schema:
+            options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+            return self._value(options[0] if options else {}, root, rng, name)
+        if "enum" in schema:
+            if name == "validation_result":
+                return "no" if rng.random() < self.profile.reject_rate else "yes"
+            return rng.choice(schema["enum"])
+        kind = schema.get("type")
+        if kind == "object":
+            return {
+                prop: self._value(prop_schema, root, rng, prop)
+                for prop, prop_schema in schema.get("properties", {}).items()
+            }
+        if kind == "array":
+            return [self._value(schema.get("items", {}), root, rng, name) for _ in range(self.profile.list_items)]
+        if kind == "integer":
+            return self.profile.list_items
+        if kind == "number":
+            return rng.random()
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return self._words(rng, self.profile.completion_words)
+
+    async def _chunks(self, body: Dict[str, Any], rng: random.Random) -> AsyncIterator[bytes]:
+        message = self._message(body, rng)
+        if message.get("tool_calls"):
+            deltas = [{"role": "assistant", "tool_calls": [{"index": 0, **message["tool_calls"][0]}]}]
+            finish_reason = "tool_calls"
+        else:
+            words = message["content"].split(" ")
+            deltas = [{"role": "assistant", "content": ""}] + [{"content": f"{word} "} for word in words]
+            finish_reason = "stop"
+        pause = 1.0 / self.profile.llm_tokens_per_second if self.profile.llm_tokens_per_second > 0 else 0.0
+        for delta in deltas:
+            if pause:
+                await asyncio.sleep(pause)
+            yield _sse(_chunk(body, delta, None))
+        yield _sse(_chunk(body, {}, finish_reason))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            text = message.get("content") or json.dumps(message.get("tool_calls"))
+            yield _sse({**_chunk(body, {}, None), "choices": [], "usage": _usage(body, text)})
+        yield b"data: [DONE]\n\n"
+
+    def _search(self, body: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        count = min(int(body.get("max_results") or self.profile.search_results), self.profile.search_results)
+        results = []
+        for index in rng.sample(range(self.profile.url_pool), k=min(count, self.profile.url_pool)):
+            url = f"https://site{index % 50}.bench/page/{index}"
+            results.append(
+                {
+                    "url": url,
+                    "title": self._words(rng, 6),
+                    "content": self._page(url)[:500],
+                    "score": rng.random(),
+                    "raw_content": None,
+                }
+            )
+        return {"query": body.get("query", ""), "results": results, "response_time": 0.0}
+
+    def _extract(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        urls = body.get("urls") or []
+        urls = [urls] if isinstance(urls, str) else urls
+        return {"results": [{"url": url, "raw_content": self._page(url)} for url in urls], "failed_results": []}
+
+    def _page(self, url: str) -> str:
+        rng = random.Random(f"{self.profile.seed}:{url}")
+        paragraphs = [self._words(rng, 100) for _ in range(max(self.profile.page_words // 100, 1))]
+        return "\n\n".join(paragraphs)
+
+
+class _Stream(httpx.AsyncByteStream):
+    def __init__(self, chunks: AsyncIterator[bytes], transport: FakeProviderTransport, kind: str) -> None:
+        self._chunks = chunks
+        self._transport = transport
+        self._kind = kind
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._chunks:
+            self._transport.bytes_sent[self._kind] += len(chunk)
+            yield chunk
+
+
+def _completion(body: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+    text = message.get("content") or json.dumps(message.get("tool_calls"))
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "bench"),
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+            }
+        ],
+        "usage": _usage(body, text),
+    }
+
+
+def _chunk(body: Dict[str, Any], delta: Dict[str, Any], finish_reason: str | None) -> Dict[str, Any]:
+    return {
+        "id": "chatcmpl-bench",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model", "bench"),
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _usage(body: Dict[str, Any], text: str) -> Dict[str, int]:
+    prompt = sum(len(str(message.get("content") or "")) for message in body.get("messages", [])) // 4
+    completion = len(text) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def _sse(payload: Dict[str, Any]) -> bytes:
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
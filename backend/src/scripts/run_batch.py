@@ -0,0 +1,121 @@
+"""
+Answers the questions of a JSONL file and appends the answers to another JSONL file.
+
+Usage:
+    python -m src.scripts.run_batch questions.jsonl answers.jsonl [--concurrency 8]
+
+Every input line is a JSON object with the question under `query` (see --query-field) and
+optionally an `id` and a forced `mode`; lines without an id are identified by their line number.
+Answers are written as soon as they are ready, so an interrupted run is resumed by starting it
+again with the same output file: questions that already have an answer there are skipped.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import AsyncIterator, Set
+
+from pydantic import ValidationError
+
+from src.api.schemas.query import BatchQuery
+from src.api.services.batch import run_batch
+from src.config.batch import batch_settings
+from src.graph.engine import engine
+from src.models.http_client import http_pool
+
+
+def answered_ids(output: Path) -> Set[str]:
+    """Ids that already have an answer in `output`, a torn last line of an interrupted run is ignored"""
+    if not output.exists():
+        return set()
+    done = set()
+    with output.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("answer") is not None:
+                done.add(str(record["id"]))
+    return done
+
+
+async def read_questions(
+    path: Path, query_field: str, id_field: str, skip: Set[str], invalid: list
+) -> AsyncIterator[BatchQuery]:
+    with path.open(encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                item = BatchQuery(
+                    id=str(record.get(id_field, number)), query=record[query_field], mode=record.get("mode")
+                )
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError, ValidationError) as exc:
+                invalid.append((number, repr(exc)))
+                continue
+            if item.id not in skip:
+                yield item
+
+
+def _ensure_newline(output: Path) -> None:
+    if output.exists() and output.stat().st_size:
+        with output.open("rb+") as file:
+            file.seek(-1, 2)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+
+
+async def main(args: argparse.Namespace) -> int:
+    skip = answered_ids(args.output) if args.resume else set()
+    if skip:
+        print(f"Resuming, {len(skip)} questions already answered")
+    invalid: list = []
+    answered = failed = deduplicated = 0
+    started = time.monotonic()
+
+    if not args.resume:
+        args.output.write_text("", encoding="utf-8")
+    _ensure_newline(args.output)
+    try:
+        with args.output.open("a", encoding="utf-8") as output:
+            questions = read_questions(args.input, args.query_field, args.id_field, skip, invalid)
+            async for result in run_batch(questions, args.concurrency):
+                output.write(result.model_dump_json() + "\n")
+                output.flush()
+                failed += result.error is not None
+                answered += result.error is None
+                deduplicated += result.deduplicated
+                if args.progress_every > 0 and (answered + failed) % args.progress_every == 0:
+                    print(f"{answered + failed} done, {failed} failed, {time.monotonic() - started:.1f} s")
+    finally:
+        await engine.close()
+        await http_pool.close()
+
+    for number, error in invalid:
+        print(f"Skipped invalid line {number}: {error}")
+    print(
+        f"Answered {answered} questions ({deduplicated} deduplicated), {failed} failed, "
+        f"in {time.monotonic() - started:.1f} s"
+    )
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", type=Path, help="JSONL file with the questions")
+    parser.add_argument("output", type=Path, help="JSONL file the answers are appended to")
+    parser.add_argument("--concurrency", type=int, default=batch_settings.BATCH_CONCURRENCY)
+    parser.add_argument("--query-field", default="query", help="field holding the question")
+    parser.add_argument("--id-field", default="id", help="field holding the question id")
+    parser.add_argument("--progress-every", type=int, default=50, help="print progress every N answers, 0 for never")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", help="overwrite the output file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
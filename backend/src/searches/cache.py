@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from src.config.cache import cache_settings
+from src.observability.metrics import register_stats
+
+
+def normalize_url(url: str) -> str:
+    """Lowercases scheme and host, drops the fragment and a trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def normalize_params(params: Dict[str, Any]) -> str:
+    """Serializes call parameters into a stable string: None values dropped, keys sorted, query whitespace folded."""
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name == "query" and isinstance(value, str):
+            value = " ".join(value.lower().split())
+        normalized[name] = value
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class TTLCache:
+    """
+    Two-tier cache: a bounded in-memory LRU in front of a SQLite table.
+
+    Values must be JSON-serializable, they are stored zlib-compressed on disk. Every entry lives
+    in a namespace with its own TTL, so search and extract results expire independently.
+    """
+
+    _PURGE_EVERY = 256
+
+    def __init__(self, path: Path, memory_items: int, disk_max_items: int, enabled: bool = True) -> None:
+        self._path = path
+        self._memory_items = memory_items
+        self._disk_max_items = disk_max_items
+        self._enabled = enabled
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(namespace: str, raw_key: str) -> str:
+        return f"{namespace}:{hashlib.sha256(raw_key.encode('utf-8')).hexdigest()}"
+
+    async def get(self, namespace: str, raw_key: str) -> Optional[Any]:
+        if not self._enabled:
+            return None
+        key = self.make_key(namespace, raw_key)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self._count(namespace, "memory_hits")
+                return value
+            del self._memory[key]
+
+        entry = await asyncio.to_thread(self._disk_get, key, now)
+        if entry is None:
+            self._count(namespace, "misses")
+            return None
+        self._remember(key, entry)
+        self._count(namespace, "disk_hits")
+        return entry[1]
+
+    async def set(self, namespace: str, raw_key: str, value: Any, ttl: int) -> None:
+        if not self._enabled or ttl <= 0:
+            return
+        key = self.make_key(namespace, raw_key)
+        expires_at = time.time() + ttl
+        self._remember(key, (expires_at, value))
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        await asyncio.to_thread(self._disk_set, key, expires_at, blob)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for namespace, counters in self._stats.items():
+            lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            result[namespace] = {**counters, "hit_ratio": hits / lookups if lookups else 0.0}
+        return result
+
+    def _count(self, namespace: str, counter: str) -> None:
+        counters = self._stats.setdefault(namespace, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[counter] += 1
+
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_items:
+            self._memory.popitem(last=False)
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+        return self._connection
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        with self._db_lock:
+            row = self._db().execute("SELECT expires_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] <= now:
+            return None
+        return row[0], json.loads(zlib.decompress(row[1]).decode("utf-8"))
+
+    def _disk_set(self, key: str, expires_at: float, blob: bytes) -> None:
+        with self._db_lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)", (key, expires_at, blob)
+            )
+            self._writes += 1
+            if self._writes % self._PURGE_EVERY == 0:
+                db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+                db.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self._disk_max_items,),
+                )
+            db.commit()
+
+
+search_cache = TTLCache(
+    path=cache_settings.CACHE_PATH,
+    memory_items=cache_settings.CACHE_MEMORY_ITEMS,
+    disk_max_items=cache_settings.CACHE_DISK_MAX_ITEMS,
+    enabled=cache_settings.CACHE_ENABLED,
+)
+register_stats("researcher_cache", "namespace", search_cache.stats)
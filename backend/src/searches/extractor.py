@@ -1,38 +1,293 @@
 import asyncio
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Dict, Iterable, List, Optional, Set, Tuple
 
-from tavily import AsyncTavilyClient
-
+from src.config.cache import cache_settings
 from src.config.search import search_settings
-from src.config.settings import LLM_SETTINGS
+from src.config.settings import get_llm_settings
+from src.models.governor import tavily_governor
+from src.models.singleflight import flights
+from src.observability.tracing import span
+from src.searches.cache import normalize_params, normalize_url, search_cache
+from src.searches.selection import Candidate, UrlSelector
+
+if TYPE_CHECKING:
+    from src.searches.tavily_client import PooledTavilyClient
+
+
+@lru_cache(maxsize=None)
+def get_tavily_client() -> "PooledTavilyClient":
+    """The shared Tavily client, built on first use together with the SDK it imports."""
+    from src.searches.tavily_client import PooledTavilyClient  # pylint: disable=import-outside-toplevel
+
+    return PooledTavilyClient(api_key=get_llm_settings().TAVILY_API_KEY)
+
+
+PageKey = Tuple[int, int]
+
+_DONE = object()
+
+
+@dataclass
+class ExtractedPage:
+    """A unique extracted URL together with every query that asked for it.
+
+    Attributes:
+        key: `(query_index, url_index)` of the first request for the URL, used for stable ordering
+        url: the requested URL
+        raw_content: extracted page text
+        query_indices: indices of all queries whose results contained the URL
+    """
+
+    key: PageKey
+    url: str
+    raw_content: str = ""
+    query_indices: List[int] = field(default_factory=list)
+
+
+def _search_params(query: str, country: str = None) -> Dict[str, Any]:
+    params = {"query": query, "search_depth": "advanced", "max_results": search_settings.MAX_RESULTS}
+    if country:
+        params["country"] = country
+    return params
+
+
+async def cached_search(**params: Any) -> Dict[str, Any]:
+    """A Tavily search served from the search cache, or shared with an identical search in flight"""
+    with span("tavily search", query_chars=len(params["query"]), country=params.get("country")) as current:
+        raw_key = normalize_params(params)
+        cached = await search_cache.get("search", raw_key)
+        current.set(cached=cached is not None)
+        if cached is not None:
+            return cached
+        current.set(coalesced=flights.in_flight("search", raw_key))
+        response = await flights.run("search", raw_key, lambda: _search(params, raw_key))
+        current.set(results=len(response.get("results", [])))
+        return response
+
+
+async def _search(params: Dict[str, Any], raw_key: str) -> Dict[str, Any]:
+    response = await tavily_governor.run(lambda: get_tavily_client().search(**params), operation="search")
+    if response.get("results"):
+        await search_cache.set("search", raw_key, response, cache_settings.SEARCH_CACHE_TTL)
+    return response
+
+
+class _ExtractBatcher:
+    """
+    Deduplicates URLs across queries and extracts them in multi-URL batches.
+
+    A batch is sent once it reaches EXTRACT_BATCH_SIZE URLs or EXTRACT_BATCH_WAIT seconds after its
+    first URL, so early search results are not held back waiting for slower searches. A URL that
+    another request is already extracting is not sent again, the page waits for that extract. A
+    batch keeps running when the request that sent it is cancelled, until no page of it is awaited.
+    """
 
-tavily_client = AsyncTavilyClient(api_key=LLM_SETTINGS.TAVILY_API_KEY)
+    def __init__(self, queue: asyncio.Queue) -> None:
+        self._queue = queue
+        self._pages: Dict[str, ExtractedPage] = {}
+        self._pending: List[Tuple[ExtractedPage, "asyncio.Future[str]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Task] = set()
+        self.requested = 0
+        self.extract_calls = 0
+        self.coalesced = 0
 
+    async def request(self, key: PageKey, url: str) -> None:
+        self.requested += 1
+        normalized = normalize_url(url)
+        page = self._pages.get(normalized)
+        if page is not None:
+            if key[0] not in page.query_indices:
+                page.query_indices.append(key[0])
+            return
 
-async def fetch_and_extract(queries, foreign_query: str = None, country: str = None):
+        page = ExtractedPage(key=key, url=url, query_indices=[key[0]])
+        self._pages[normalized] = page
+        cached = await search_cache.get("extract_page", normalized)
+        if cached is not None:
+            page.raw_content = cached["raw_content"]
+            self._queue.put_nowait(page)
+            return
 
-    processed_queries = [
-        {"query": query, "search_depth": "advanced", "max_results": search_settings.MAX_RESULTS} for query in queries
-    ]
+        self.coalesced += flights.in_flight("extract", normalized)
+        self._track(self._deliver(page, flights.run("extract", normalized, lambda: self._enqueue(page))))
 
-    if foreign_query:
-        processed_foreign_query = [
+    async def drain(self) -> None:
+        self._flush()
+        while self._in_flight:
+            await asyncio.gather(*self._in_flight)
+
+    @property
+    def unique(self) -> int:
+        return len(self._pages)
+
+    def _enqueue(self, page: ExtractedPage) -> "asyncio.Future[str]":
+        """Adds the page to the next batch, the future gets its text, empty when the extract failed"""
+        content = asyncio.get_running_loop().create_future()
+        self._pending.append((page, content))
+        if len(self._pending) >= search_settings.EXTRACT_BATCH_SIZE:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(search_settings.EXTRACT_BATCH_WAIT, self._flush)
+        return content
+
+    async def _deliver(self, page: ExtractedPage, content: Awaitable[str]) -> None:
+        page.raw_content = await content
+        if page.raw_content:
+            self._queue.put_nowait(page)
+
+    def _track(self, work: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(work)
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(page, content) for page, content in self._pending if not content.done()]
+        self._pending = []
+        if not batch:
+            return
+        extract = asyncio.ensure_future(self._extract(batch))
+        for _, content in batch:
+            content.add_done_callback(lambda _: self._abandon(batch, extract))
+        self._track(asyncio.shield(extract))
+
+    @staticmethod
+    def _abandon(batch: List[Tuple[ExtractedPage, "asyncio.Future[str]"]], extract: asyncio.Future) -> None:
+        """Cancels the extract once every page of its batch is abandoned by its waiters"""
+        if not extract.done() and all(content.cancelled() for _, content in batch):
+            extract.cancel()
+
+    async def _extract(self, batch: List[Tuple[ExtractedPage, "asyncio.Future[str]"]]) -> None:
+        self.extract_calls += 1
+        contents: Dict[str, str] = {}
+        try:
+            with span("tavily extract", urls=len(batch)) as current:
+                try:
+                    response = await tavily_governor.run(
+                        lambda: get_tavily_client().extract(urls=[page.url for page, _ in batch]), operation="extract"
+                    )
+                except Exception as exc:  # pylint: disable=broad-except
+                    print(f"Extract failed for {len(batch)} urls: {exc!r}")
+                    return
+
+                results = {
+                    normalize_url(result["url"]): result for result in response.get("results", []) if result.get("url")
+                }
+                for page, _ in batch:
+                    result = results.get(normalize_url(page.url))
+                    if result is None or not result.get("raw_content"):
+                        print(f"Extract failed for {page.url}")
+                        continue
+                    contents[page.url] = result["raw_content"]
+                current.set(pages=len(contents), content_chars=sum(map(len, contents.values())))
+        finally:
+            for page, content in batch:
+                if not content.done():
+                    content.set_result(contents.get(page.url, ""))
+        for url, raw_content in contents.items():
+            await search_cache.set(
+                "extract_page",
+                normalize_url(url),
+                {"url": url, "raw_content": raw_content},
+                cache_settings.EXTRACT_CACHE_TTL,
+            )
+
+
+async def stream_extract(
+    queries: List[str],
+    foreign_query: Optional[Awaitable[Optional[Tuple[str, str]]]] = None,
+    stats: Optional[Dict[str, int]] = None,
+    max_pages: Optional[int] = None,
+    exclude_urls: Iterable[str] = (),
+) -> AsyncIterator[ExtractedPage]:
+    """
+    Searches every query, selects pages under the request budget and yields each unique extracted
+    page as soon as it is fetched.
+
+    Each query's guaranteed pages are extracted as soon as its search returns; the rest of the page
+    budget is filled across all queries once the subquestion searches are done (see `UrlSelector`).
+
+    Args:
+        queries: search queries, all of them are sent immediately.
+        foreign_query: awaitable resolving to a `(query, country)` pair (or None) that joins the
+            pipeline once it is ready, so a slow translation does not hold back the other searches.
+            It gets query index `len(queries)`.
+        stats: optional dict filled with URL and extract call counters once the stream is exhausted,
+            `urls_coalesced` counts URLs that joined an extract of another request.
+        max_pages: page budget of the request, MAX_PAGES by default.
+        exclude_urls: URLs that must not be extracted again.
+
+    Yields:
+        Extracted pages. A page's `query_indices` may still grow after it was yielded, when a later
+        search returns the same URL; it is final once the stream is exhausted.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    batcher = _ExtractBatcher(queue)
+    selector = UrlSelector(max_pages=max_pages, exclude_urls=exclude_urls)
+
+    async def _request(candidates: List[Candidate]) -> None:
+        for candidate in candidates:
+            await batcher.request((candidate.query_index, candidate.rank), candidate.url)
+
+    async def _search(params: Dict[str, Any], query_index: int) -> None:
+        response = await cached_search(**params)
+        await _request(selector.add(query_index, response))
+
+    async def _foreign() -> None:
+        resolved = await foreign_query
+        if resolved:
+            query, country = resolved
+            await _search(_search_params(query, country), len(queries))
+
+    async def _produce() -> None:
+        foreign = asyncio.create_task(_foreign()) if foreign_query is not None else None
+        try:
+            searches = await asyncio.gather(
+                *(_search(_search_params(query), i) for i, query in enumerate(queries)), return_exceptions=True
+            )
+            for result in searches:
+                if isinstance(result, Exception):
+                    print(f"Search failed: {result!r}")
+            await _request(selector.fill())
+
+            if foreign is not None:
+                try:
+                    await foreign
+                except Exception as exc:  # pylint: disable=broad-except
+                    print(f"Foreign search failed: {exc!r}")
+                await _request(selector.fill())
+            await batcher.drain()
+        finally:
+            if foreign is not None:
+                foreign.cancel()
+            queue.put_nowait(_DONE)
+
+    producer = asyncio.create_task(_produce())
+    try:
+        while (page := await queue.get()) is not _DONE:
+            yield page
+    finally:
+        producer.cancel()
+
+    if stats is not None:
+        stats.update(
             {
-                "query": foreign_query,
-                "search_depth": "advanced",
-                "max_results": search_settings.MAX_RESULTS,
-                "country": country,
+                "urls_requested": batcher.requested,
+                "urls_unique": batcher.unique,
+                "extract_calls": batcher.extract_calls,
+                "urls_coalesced": batcher.coalesced,
             }
-        ]
-        processed_queries += processed_foreign_query
-
-    responses = await asyncio.gather(*[tavily_client.search(**q) for q in processed_queries])
+        )
 
-    relevant_urls = []
-    for response in responses:
-        for result in response.get("results", []):
-            if result.get("score", 0) > search_settings.SEARCH_THRESHOLD:
-                relevant_urls.append(result.get("url"))
 
-    extracted_data = await asyncio.gather(*(tavily_client.extract(url) for url in relevant_urls))
+async def fetch_and_extract(queries, foreign_query: str = None, country: str = None) -> List[ExtractedPage]:
+    async def _resolved_foreign_query():
+        return (foreign_query, country) if foreign_query else None
 
-    return extracted_data
+    pages = [page async for page in stream_extract(queries, _resolved_foreign_query())]
+    return sorted(pages, key=lambda page: page.key)
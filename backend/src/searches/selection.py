@@ -0,0 +1,129 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Set
+from urllib.parse import urlsplit
+
+from src.config.search import search_settings
+from src.searches.cache import normalize_url
+
+CHARS_PER_TOKEN = 4
+
+_WORD = re.compile(r"\w+")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+@dataclass
+class Candidate:
+    query_index: int
+    rank: int
+    url: str
+    title: str
+    score: float
+
+    @property
+    def domain(self) -> str:
+        netloc = urlsplit(self.url).netloc.lower()
+        return netloc[4:] if netloc.startswith("www.") else netloc
+
+
+def _title_tokens(title: str) -> Set[str]:
+    return set(_WORD.findall(title.lower()))
+
+
+class UrlSelector:
+    """
+    Picks the pages to extract across all queries of a request under a page budget.
+
+    Every query is guaranteed its best MIN_PAGES_PER_QUERY pages as soon as its results are added
+    (while the budget lasts). The rest of the budget is filled greedily from all pooled candidates by
+    search score, penalized for domains already selected and for titles similar to selected ones.
+    URLs in `exclude_urls`, e.g. pages a previous attempt already used, are never selected.
+    """
+
+    def __init__(self, max_pages: int = None, min_per_query: int = None, exclude_urls: Iterable[str] = ()) -> None:
+        self._max_pages = search_settings.MAX_PAGES if max_pages is None else max_pages
+        self._min_per_query = search_settings.MIN_PAGES_PER_QUERY if min_per_query is None else min_per_query
+        self._excluded = {normalize_url(url) for url in exclude_urls}
+        self._pool: List[Candidate] = []
+        self._selected_urls: Set[str] = set()
+        self._domains: Counter = Counter()
+        self._titles: List[Set[str]] = []
+
+    @property
+    def remaining(self) -> int:
+        return self._max_pages - len(self._selected_urls)
+
+    def add(self, query_index: int, response: Dict[str, Any]) -> List[Candidate]:
+        """
+        Pools the results of one search and returns the candidates to extract right away.
+
+        Args:
+            query_index: index of the query the results belong to.
+            response: Tavily search response.
+
+        Returns:
+            Guaranteed picks for this query plus its results whose URL is already selected.
+        """
+        candidates = sorted(
+            (
+                Candidate(query_index, rank, result["url"], result.get("title") or "", result.get("score", 0))
+                for rank, result in enumerate(response.get("results", []))
+                if result.get("url")
+                and result.get("score", 0) > search_settings.SEARCH_THRESHOLD
+                and normalize_url(result["url"]) not in self._excluded
+            ),
+            key=lambda candidate: candidate.score,
+            reverse=True,
+        )
+
+        picks = []
+        guaranteed = 0
+        for candidate in candidates:
+            if normalize_url(candidate.url) in self._selected_urls:
+                picks.append(candidate)
+                guaranteed += 1
+            elif guaranteed < self._min_per_query and self.remaining > 0:
+                self._select(candidate)
+                picks.append(candidate)
+                guaranteed += 1
+            else:
+                self._pool.append(candidate)
+        return picks
+
+    def fill(self) -> List[Candidate]:
+        """Selects pooled candidates until the page budget is spent or the pool is empty."""
+        picks = []
+        while self._pool:
+            free = [c for c in self._pool if normalize_url(c.url) in self._selected_urls]
+            if free:
+                picks.extend(free)
+                self._pool = [c for c in self._pool if normalize_url(c.url) not in self._selected_urls]
+                continue
+            if self.remaining <= 0:
+                break
+            best = max(self._pool, key=self._adjusted_score)
+            self._pool.remove(best)
+            self._select(best)
+            picks.append(best)
+        return picks
+
+    def _adjusted_score(self, candidate: Candidate) -> float:
+        tokens = _title_tokens(candidate.title)
+        title_similarity = max(
+            (len(tokens & selected) / len(tokens | selected) for selected in self._titles if tokens | selected),
+            default=0.0,
+        )
+        return (
+            candidate.score
+            - search_settings.DOMAIN_PENALTY * self._domains[candidate.domain]
+            - search_settings.TITLE_PENALTY * title_similarity
+        )
+
+    def _select(self, candidate: Candidate) -> None:
+        self._selected_urls.add(normalize_url(candidate.url))
+        self._domains[candidate.domain] += 1
+        self._titles.append(_title_tokens(candidate.title))
@@ -1,20 +1,95 @@
 import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
 from langchain.agents import create_agent
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun
+from langchain_core.runnables import Runnable
+from langchain_core.tools import ToolException
 from langchain_tavily import TavilySearch
+from langchain_tavily._utilities import TAVILY_API_URL, TavilySearchAPIWrapper
 
-from src.config.settings import LLM_SETTINGS
-from src.models.llm import llm
+from src.config.cache import cache_settings
+from src.config.settings import get_llm_settings
+from src.models.governor import tavily_governor
+from src.models.http_client import http_pool
+from src.models.llm import get_llm
+from src.models.singleflight import flights
+from src.observability.tracing import span
+from src.searches.cache import normalize_params, search_cache
+from src.searches.tavily_client import PooledTavilyClient
 
-settings = LLM_SETTINGS
 
-tavily_search = TavilySearch(tavily_api_key=settings.TAVILY_API_KEY, max_results=settings.TAVILY_MAX_RESULTS)
+class PooledTavilySearchAPIWrapper(TavilySearchAPIWrapper):
+    """Search wrapper of the `TavilySearch` tool backed by `PooledTavilyClient`."""
 
+    async def raw_results_async(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        client = PooledTavilyClient(
+            api_key=self.tavily_api_key.get_secret_value(), base_url=self.api_base_url or TAVILY_API_URL
+        )
+        params = {name: value for name, value in kwargs.items() if value is not None}
+        return await client.request("/search", {"query": query, **params})
 
-llm_with_search = create_agent(
-    model=llm,
-    tools=[tavily_search],
-    system_prompt=f"""You are a helpful research assistant. Today's date is {datetime.date.today().strftime('%B %d, %Y')}. Use web search to find relevant
+
+class CachedTavilySearch(TavilySearch):
+    """TavilySearch tool that serves repeated searches from the search cache and joins identical ones in flight."""
+
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        with span("tavily tool_search", query_chars=len(query)) as current:
+            raw_key = normalize_params({"query": query, "max_results": self.max_results, **kwargs})
+            cached = await search_cache.get("tool_search", raw_key)
+            current.set(cached=cached is not None)
+            if cached is not None:
+                return cached
+            current.set(coalesced=flights.in_flight("tool_search", raw_key))
+            try:
+                result = await flights.run(
+                    "tool_search",
+                    raw_key,
+                    lambda: tavily_governor.run(
+                        lambda: self._arun_or_raise(query, run_manager, **kwargs), operation="search"
+                    ),
+                )
+            except ToolException:
+                raise
+            except Exception as exc:  # pylint: disable=broad-except
+                current.error = repr(exc)
+                return {"error": exc}
+            current.set(results=len(result.get("results", [])))
+            if result.get("results"):
+                await search_cache.set("tool_search", raw_key, result, cache_settings.SEARCH_CACHE_TTL)
+            return result
+
+    async def _arun_or_raise(
+        self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun], **kwargs: Any
+    ) -> Dict[str, Any]:
+        """TavilySearch returns request errors as `{"error": ...}`, raise them so the governor can retry"""
+        result = await super()._arun(query, run_manager=run_manager, **kwargs)
+        if isinstance(result.get("error"), Exception):
+            raise result["error"]
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_llm_with_search() -> Runnable:
+    """The simple-mode search agent, built on first use."""
+    settings = get_llm_settings()
+    tavily_search = CachedTavilySearch(
+        api_wrapper=PooledTavilySearchAPIWrapper(tavily_api_key=settings.TAVILY_API_KEY),
+        max_results=settings.TAVILY_MAX_RESULTS,
+    )
+    return create_agent(
+        model=get_llm(),
+        tools=[tavily_search],
+        system_prompt=f"""You are a helpful research assistant. Today's date is {datetime.date.today().strftime('%B %d, %Y')}. Use web search to find relevant
     information, then extract detailed content from the most promising sources to provide
     comprehensive insights.""",
-)
+    )
+
+
+http_pool.on_close(get_llm_with_search.cache_clear)
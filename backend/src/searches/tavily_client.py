@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional
+
+import httpx
+from tavily import AsyncTavilyClient
+from tavily.exceptions import (
+    BadRequestError,
+    ForbiddenError,
+    InvalidAPIKeyError,
+    TavilyError,
+    TimeoutError,
+    UsageLimitExceededError,
+)
+
+from src.models.http_client import http_pool
+
+
+def _error(response: httpx.Response) -> TavilyError:
+    """Maps a failed response to the tavily SDK exception, tagged with `status_code` for the governor"""
+    error = _sdk_error(response)
+    error.status_code = response.status_code
+    return error
+
+
+def _sdk_error(response: httpx.Response) -> TavilyError:
+    try:
+        detail = response.json().get("detail", {})
+        message = detail.get("error", response.text) if isinstance(detail, dict) else str(detail)
+    except ValueError:
+        message = response.text
+
+    if response.status_code == 401:
+        return InvalidAPIKeyError(f"Invalid API key: {message}")
+    if response.status_code == 429:
+        return UsageLimitExceededError(f"Usage limit exceeded: {message}")
+    if response.status_code == 400:
+        return BadRequestError(f"Bad request: {message}")
+    if response.status_code in (403, 432, 433):
+        return ForbiddenError(f"Forbidden: {message}")
+    return TavilyError(f"HTTP {response.status_code}: {message}")
+
+
+class PooledTavilyClient(AsyncTavilyClient):
+    """AsyncTavilyClient that sends requests over the shared connection pool instead of a session per call."""
+
+    async def search(
+        self,
+        query: str,
+        search_depth: str = "basic",
+        max_results: int = 5,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        include_answer: bool = False,
+        include_raw_content: bool = False,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        data = {
+            "query": query,
+            "search_depth": search_depth,
+            "max_results": max_results,
+            "include_answer": include_answer,
+            "include_raw_content": include_raw_content,
+        }
+        if include_domains:
+            data["include_domains"] = include_domains
+        if exclude_domains:
+            data["exclude_domains"] = exclude_domains
+        return await self.request("/search", {**data, **kwargs})
+
+    async def extract(
+        self, urls: List[str], include_images: bool = False, format: str = "markdown", **kwargs: Any
+    ) -> Dict[str, Any]:
+        return await self.request(
+            "/extract", {"urls": urls, "include_images": include_images, "format": format, **kwargs}
+        )
+
+    async def request(self, path: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await http_pool.client.post(
+                f"{self.base_url}{path}", json=data, headers=self.headers, timeout=self.timeout.total
+            )
+        except httpx.TimeoutException as exc:
+            raise TimeoutError(f"Request timed out after {self.timeout.total} seconds") from exc
+        except httpx.HTTPError as exc:
+            raise TavilyError(f"Request failed: {exc}") from exc
+        if response.status_code != 200:
+            raise _error(response)
+        return response.json()
@@ -18,6 +18,7 @@ export class AskPageComponent implements OnDestroy {
   private readonly baseUrl = '';
   private destroyed = false;
   private requestStartedAt: number | null = null;
+  private eventSource: EventSource | null = null;
 
   question = '';
   mode: Mode = 'auto';
@@ -38,6 +39,7 @@ export class AskPageComponent implements OnDestroy {
   thoughtsExpanded = false;
 
   cardResultHtml: SafeHtml | null = null;
+  private draftAttempt: number | null = null;
 
   get modeLabel(): string {
     switch (this.mode) {
@@ -66,6 +68,7 @@ export class AskPageComponent implements OnDestroy {
     this.cardMessage = 'Работаю над запросом';
     this.cardResult = '';
     this.cardResultHtml = null;
+    this.draftAttempt = null;
     this.showStatusCard = true;
     this.hasLifted = true;
     this.requestStartedAt = performance.now();
@@ -84,7 +87,7 @@ export class AskPageComponent implements OnDestroy {
       );
 
       this.currentTaskId = response.task_id;
-      await this.pollTask(response.task_id);
+      await this.streamTask(response.task_id);
     } catch (error) {
       this.cardState = 'error';
       this.cardMessage = 'Не удалось отправить запрос. Попробуйте ещё раз.';
@@ -97,6 +100,90 @@ export class AskPageComponent implements OnDestroy {
 
   ngOnDestroy(): void {
     this.destroyed = true;
+    this.closeEventSource();
+  }
+
+  private streamTask(taskId: string): Promise<void> {
+    if (typeof EventSource === 'undefined') {
+      return this.pollTask(taskId);
+    }
+
+    return new Promise(resolve => {
+      const source = new EventSource(`${this.baseUrl}/debug/tasks/${taskId}/events`);
+      this.eventSource = source;
+
+      source.addEventListener('thought', event => {
+        const data = JSON.parse((event as MessageEvent).data) as { message: string };
+        this.thoughtLines = [...this.thoughtLines, ...this.extractThoughtLines(data.message)];
+      });
+
+      source.addEventListener('token', event => {
+        const data = JSON.parse((event as MessageEvent).data) as { attempt: number; text: string };
+        if (data.attempt !== this.draftAttempt) {
+          this.draftAttempt = data.attempt;
+          this.cardResult = '';
+        }
+        this.cardResult += data.text;
+        this.cardResultHtml = this.sanitizer.bypassSecurityTrustHtml(this.renderMarkdown(this.cardResult));
+      });
+
+      source.addEventListener('validation', event => {
+        const data = JSON.parse((event as MessageEvent).data) as { attempt: number; retrying: boolean };
+        if (data.retrying) {
+          this.cardMessage = 'Ответ не прошёл проверку, уточняю';
+        }
+      });
+
+      source.addEventListener('status', event => {
+        const result = JSON.parse((event as MessageEvent).data) as TaskStatusResponse;
+        if (this.applyTaskStatus(result)) {
+          this.closeEventSource();
+          resolve();
+        }
+      });
+
+      source.onerror = () => {
+        if (this.destroyed || this.currentTaskId !== taskId) {
+          this.closeEventSource();
+          resolve();
+          return;
+        }
+        // The browser reconnects on its own with Last-Event-ID; fall back to polling only once it gives up.
+        if (source.readyState === EventSource.CLOSED) {
+          this.closeEventSource();
+          this.pollTask(taskId).then(resolve);
+        }
+      };
+    });
+  }
+
+  private closeEventSource(): void {
+    this.eventSource?.close();
+    this.eventSource = null;
+  }
+
+  private applyTaskStatus(result: TaskStatusResponse): boolean {
+    if (result.status === 'succeeded') {
+      this.cardState = 'success';
+      this.cardResult = result.result ?? 'Ответ не найден.';
+      this.cardResultHtml = this.sanitizer.bypassSecurityTrustHtml(
+        this.renderMarkdown(this.cardResult)
+      );
+      this.cardMessage = 'Результат готов';
+      this.thoughtLines = this.extractThoughtLines(result.details?.thoughts);
+      this.setProcessingTime();
+      return true;
+    }
+
+    if (result.status === 'failed' || result.status === 'error') {
+      this.cardState = 'error';
+      this.cardMessage = 'Запрос завершился с ошибкой.';
+      this.thoughtLines = [];
+      this.setProcessingTime();
+      return true;
+    }
+
+    return false;
   }
 
   private async pollTask(taskId: string): Promise<void> {
@@ -108,23 +195,7 @@ export class AskPageComponent implements OnDestroy {
           this.http.get<TaskStatusResponse>(`${this.baseUrl}/debug/tasks/${taskId}`)
         );
 
-        if (result.status === 'succeeded') {
-          this.cardState = 'success';
-          this.cardResult = result.result ?? 'Ответ не найден.';
-          this.cardResultHtml = this.sanitizer.bypassSecurityTrustHtml(
-            this.renderMarkdown(this.cardResult)
-          );
-          this.cardMessage = 'Результат готов';
-          this.thoughtLines = this.extractThoughtLines(result.details?.thoughts);
-          this.setProcessingTime();
-          return;
-        }
-
-        if (result.status === 'failed' || result.status === 'error') {
-          this.cardState = 'error';
-          this.cardMessage = 'Запрос завершился с ошибкой.';
-          this.thoughtLines = [];
-          this.setProcessingTime();
+        if (this.applyTaskStatus(result)) {
           return;
         }
       } catch (error) {